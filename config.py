@@ -16,6 +16,8 @@ INSTITUTION_FILE_PATH = r"C:\Users\OCELOU\Desktop\UF_DSE_DRIVE\UF_datasets\POWER
 
 METADATA_FILE_PATH = r"C:\Users\OCELOU\Desktop\UF_DSE_DRIVE\UF_datasets\PYTHON\Composante_Mention_Parcours_2025.xlsx"
 INSCRIPTION_FILE_PATH = r"C:\Users\OCELOU\Desktop\UF_DSE_DRIVE\UF_datasets\POWERQUERY\_UFALLTIME__KEYED.xlsx"
+# Fichier Parquet intermédiaire : inscriptions nettoyées, relues par lots pendant l'import
+INSCRIPTION_PARQUET_PATH = r"C:\Users\OCELOU\Desktop\UF_DSE_DRIVE\UF_datasets\POWERQUERY\_UFALLTIME__KEYED.parquet"
 # ----------------------------------------
 
 # --- Chemins vers les dossiers de ressources statiques ---
@@ -30,4 +32,7 @@ LOGO_FOLDER_PATH = r"C:\Users\OCELOU\Desktop\UF_DSE_DRIVE\UF_datasets\POWERQUERY
 DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}?client_encoding=utf8"
 
 # URL pour la BDD par défaut (utile pour la création de la BDD cible)
-DEFAULT_DB_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/postgres?client_encoding=utf8"
\ No newline at end of file
+DEFAULT_DB_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/postgres?client_encoding=utf8"
+
+# Seuil (en millisecondes) au-delà duquel une requête est journalisée comme lente
+SEUIL_REQUETE_LENTE_MS = 100
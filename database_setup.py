@@ -1,18 +1,38 @@
 # database_setup.py
 
 import sys
-from sqlalchemy import create_engine
+import time
+import logging
+from sqlalchemy import create_engine, event, select, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy_utils import database_exists, create_database
 
 import config
-from models import Base
+from models import (
+    Base, TABLES_PARTITIONNEES_PAR_ANNEE, FILLFACTOR_PARTITIONS, SQL_VUES_MATERIALISEES, SQL_VUE_RESULTATS
+)
 
 # --- Initialisation du moteur et de la session ---
 
 # Moteur pour la BDD cible
 try:
-    engine = create_engine(config.DATABASE_URL) 
+    # Les executemany (bulk_*_mappings, session.execute(stmt, [dicts])) sont regroupés en
+    # INSERT ... VALUES multi-lignes / execute_batch par psycopg2, au lieu d'une requête par ligne.
+    engine = create_engine(
+        config.DATABASE_URL,
+        executemany_mode='values_plus_batch',
+        insertmanyvalues_page_size=5000,
+        # Pool : LIFO pour réutiliser les connexions "chaudes" et laisser expirer les inactives ;
+        # pre_ping écarte les connexions coupées côté serveur avant de les confier à une session.
+        pool_size=20,
+        max_overflow=30,
+        pool_timeout=30,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+        # Cache des instructions compilées agrandi (500 par défaut) : voir prechauffer_cache()
+        query_cache_size=2000,
+    ) 
     # Moteur pour la BDD par défaut (pour la création)
     default_engine = create_engine(config.DEFAULT_DB_URL) 
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -21,6 +41,54 @@ except Exception as e:
     sys.exit(1)
 
 
+# --- Journal des requêtes lentes ---
+
+# Journal dédié, sans propagation : import_errors.log (logger racine) ne reçoit que les erreurs par ligne
+logger_requetes_lentes = logging.getLogger('requetes_lentes')
+logger_requetes_lentes.setLevel(logging.WARNING)
+logger_requetes_lentes.propagate = False
+if not logger_requetes_lentes.handlers:
+    _handler_requetes_lentes = logging.FileHandler('requetes_lentes.log', encoding='utf-8', delay=True)
+    _handler_requetes_lentes.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger_requetes_lentes.addHandler(_handler_requetes_lentes)
+
+
+@event.listens_for(engine, 'before_cursor_execute')
+def _debut_requete(conn, cursor, statement, parameters, context, executemany):
+    # Début porté par le contexte d'exécution propre à l'instruction : aucun état partagé sur la connexion
+    if context is not None:
+        context._debut_requete = time.perf_counter()
+
+
+@event.listens_for(engine, 'after_cursor_execute')
+def _fin_requete(conn, cursor, statement, parameters, context, executemany):
+    debut = getattr(context, '_debut_requete', None)
+    if debut is None:
+        return
+    duree_ms = (time.perf_counter() - debut) * 1000
+    if duree_ms >= config.SEUIL_REQUETE_LENTE_MS:
+        logger_requetes_lentes.warning(f"REQUETE_LENTE: {duree_ms:.0f} ms | {statement[:500]}")
+
+
+def rafraichir_vues_materialisees(session):
+    """
+    Rafraîchit les vues matérialisées sans bloquer leur lecture (CONCURRENTLY, grâce à leur index unique).
+    À lancer après chaque import ou saisie de notes de fin de session.
+    """
+    for nom_vue in SQL_VUES_MATERIALISEES:
+        session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {nom_vue}"))
+
+
+def rafraichir_vue_resultats(session):
+    """
+    Reconstruit vue_resultats_etudiant en deux instructions ensemblistes (DELETE puis INSERT ... SELECT),
+    dans la transaction de la session : les notes supprimées ou déplacées (année, session) disparaissent
+    aussi de la table, et les lecteurs voient l'ancien contenu jusqu'au commit.
+    """
+    session.execute(text("DELETE FROM vue_resultats_etudiant"))
+    session.execute(text(SQL_VUE_RESULTATS))
+
+
 def get_session():
     """Fournit une nouvelle session de base de données."""
     return SessionLocal()
@@ -45,8 +113,45 @@ def init_db():
     # 2. Création des tables
     print("Création des tables (si elles n'existent pas)...")
     try:
-        Base.metadata.create_all(bind=engine)
+        # Les classes mappées sur des vues (info is_view) sont exclues : leurs vues sont créées ci-dessous
+        tables = [table for table in Base.metadata.sorted_tables if not table.info.get('is_view')]
+        Base.metadata.create_all(bind=engine, tables=tables)
         print("Tables créées/vérifiées.")
+        
+        with engine.begin() as connexion:
+            for instructions in SQL_VUES_MATERIALISEES.values():
+                for instruction in instructions:
+                    connexion.execute(text(instruction))
+        print("Vues matérialisées créées/vérifiées.")
     except Exception as e:
         print(f"❌ ERREUR: Impossible de créer les tables. Détail: {e}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+
+def creer_partitions_annuelles(session, annees: list):
+    """
+    Crée (si absente) la partition de chaque année universitaire pour les tables
+    partitionnées par année. À appeler avant de charger des données d'une nouvelle année :
+    PostgreSQL refuse la création si la partition DEFAULT contient déjà des lignes de cette année.
+    """
+    for table in TABLES_PARTITIONNEES_PAR_ANNEE:
+        for annee in annees:
+            nom_partition = f"{table.name}_{annee.replace('-', '_')}"
+            valeur = annee.replace("'", "''")
+            session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {nom_partition} PARTITION OF {table.name} FOR VALUES IN ('{valeur}') "
+                f"WITH (fillfactor = {FILLFACTOR_PARTITIONS})"
+            ))
+
+
+def prechauffer_cache():
+    """
+    Exécute un SELECT ... LIMIT 0 par classe mappée pour compiler ces instructions au démarrage
+    et remplir le cache de compilation du moteur, au lieu de payer la compilation à la première requête.
+    """
+    session = get_session()
+    try:
+        for mapper in Base.registry.mappers:
+            session.execute(select(mapper.class_).limit(0))
+    finally:
+        session.close()
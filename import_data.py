@@ -1,12 +1,21 @@
 # import_data.py
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import sys
+import io
+import gc
+import json
+import math
+import importlib.util
 import logging
 from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor, wait
+from sqlalchemy import bindparam, select, text
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, DataError
-from datetime import date 
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import os
 
 # Assurez-vous que config.py et database_setup.py sont bien configurés
@@ -29,6 +38,154 @@ logging.basicConfig(filename='import_errors.log',
                     level=logging.ERROR,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Taille des lots pour les insertions en masse (INSERT ... VALUES multi-lignes)
+TAILLE_LOT = 10_000
+# Taille des lots de liaisons Parcours <-> Niveau
+TAILLE_LOT_PARCOURS_NIVEAUX = 1_000
+# Taille des lots d'étudiants (un SAVEPOINT et un commit par lot)
+TAILLE_LOT_ETUDIANTS = 5_000
+
+# Tables chargées en mode --bulk (clés étrangères et index secondaires suspendus)
+TABLES_CHARGEMENT_BULK = ['etudiants', 'inscriptions']
+
+# Codes SQLSTATE PostgreSQL utilisés pour classer les lignes rejetées
+PGCODE_CLE_ETRANGERE = '23503'          # foreign_key_violation
+PGCODES_UNICITE = ('23505', '23502')    # unique_violation, not_null_violation
+PGCODES_DONNEES = ('22001', '22007')    # string_data_right_truncation, invalid_datetime_format
+
+# Colonnes de la table Etudiant alimentées par le fichier d'inscriptions
+COLONNES_ETUDIANT = [
+    'code_etudiant', 'numero_inscription', 'nom', 'prenoms', 'sexe',
+    'naissance_date', 'naissance_lieu', 'nationalite',
+    'bacc_annee', 'bacc_serie', 'bacc_centre',
+    'adresse', 'telephone', 'mail',
+    'cin', 'cin_date', 'cin_lieu',
+]
+
+
+# Moteur de lecture Excel : python-calamine (Rust) s'il est installé, sinon le moteur par défaut (openpyxl)
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else None
+
+# Colonnes utiles de chaque fichier Excel (noms normalisés) et leur type forcé à la lecture.
+# Seules les clés, nettoyées ensuite par safe_string_series, sont typées en 'string'.
+DTYPES_EXCEL_INSTITUTIONS = {'institution_id': 'string', 'institution_nom': None, 'institution_type': None}
+
+DTYPES_EXCEL_METADATA = {
+    'institution_id': 'string', 'composante': 'string', 'label_composante': None,
+    'domaine': 'string', 'label_domaine': None,
+    'mention': None, 'label_mention': None, 'id_mention': 'string',
+    'parcours': None, 'label_parcours': None, 'id_parcours': 'string',
+    'date_creation': None, 'date_fin': None,
+}
+
+DTYPES_EXCEL_INSCRIPTIONS = {
+    **{col: None for col in COLONNES_ETUDIANT},
+    'code_etudiant': 'string',
+    'code_inscription': 'string', 'annee_universitaire': 'string',
+    'id_parcours': 'string', 'id_parcours_caractere': 'string',
+    'code_semestre': 'string', 'semestre_id': 'string', 'semestre': 'string', 'niveau': 'string',
+    'code_mode_inscription': 'string', 'type_formation': 'string', 'type_formation_code': 'string',
+}
+
+# Colonne du fichier Parquet intermédiaire portant l'index de ligne Excel d'origine
+COLONNE_LIGNE_EXCEL = 'ligne_excel_idx'
+
+# Colonnes d'Inscription chargées par COPY / upsert, nommées comme les attributs du modèle (records prêts à l'insertion)
+COLONNES_COPY_INSCRIPTION = [
+    'code_inscription', 'code_etudiant', 'annee_universitaire',
+    'id_parcours', 'code_semestre', 'code_mode_inscription',
+]
+
+# INSERT ... ON CONFLICT des inscriptions, construit une seule fois et mis en cache de compilation :
+# seuls les paramètres changent d'un lot à l'autre
+_insert_inscription = pg_insert(Inscription.__table__)
+_INSCRIPTION_UPSERT = _insert_inscription.on_conflict_do_update(
+    index_elements=['code_inscription'],
+    set_={col: _insert_inscription.excluded[col] for col in COLONNES_COPY_INSCRIPTION if col != 'code_inscription'}
+)
+
+
+def _vers_records(df: pd.DataFrame) -> list:
+    """Convertit un DataFrame en liste de dicts, valeurs manquantes (NaN, NA, NaT) remplacées par None."""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def _journaliser_erreurs(messages: list):
+    """
+    Écrit d'un bloc les erreurs accumulées pendant un lot dans le journal, avec le même
+    format que logging.error, puis vide la liste : un verrou et une écriture par lot.
+    """
+    if not messages:
+        return
+    racine = logging.getLogger()
+    records = [
+        racine.makeRecord(racine.name, logging.ERROR, __file__, 0, message, None, None)
+        for message in messages
+    ]
+    for handler in racine.handlers:
+        if not isinstance(handler, logging.StreamHandler):
+            # Handlers sans flux (file d'attente, syslog...) : chemin standard, filtres et niveau compris
+            for record in records:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            continue
+        lignes = [
+            handler.format(record) + '\n'
+            for record in records
+            if record.levelno >= handler.level and handler.filter(record)
+        ]
+        handler.acquire()
+        try:
+            handler.stream.writelines(lignes)
+            handler.flush()
+        finally:
+            handler.release()
+    messages.clear()
+
+
+def _normaliser_colonne(nom) -> str:
+    """Normalise un en-tête Excel (minuscules, espaces remplacés par des underscores)."""
+    return str(nom).lower().replace(' ', '_')
+
+
+def _signature_excel(chemin: str, colonnes: dict) -> dict:
+    """Identifie une lecture d'un fichier Excel : date de modification, taille et colonnes demandées."""
+    stat = os.stat(chemin)
+    return {'mtime_ns': stat.st_mtime_ns, 'taille': stat.st_size, 'colonnes': sorted(colonnes)}
+
+
+def _lire_excel(chemin: str, colonnes: dict) -> pd.DataFrame:
+    """
+    Lit uniquement les colonnes utiles d'un fichier Excel, normalise leurs noms et applique leurs types.
+    Le résultat est mis en cache à côté du fichier (<fichier>.parquet) et réutilisé tant que
+    le fichier Excel n'a pas changé (même date de modification et même taille).
+    """
+    chemin_cache = chemin + '.parquet'
+    chemin_meta = chemin + '.parquet.meta'
+    signature = _signature_excel(chemin, colonnes)
+    
+    try:
+        with open(chemin_meta, encoding='utf-8') as f:
+            if json.load(f) == signature:
+                print(f"Cache Parquet utilisé pour {os.path.basename(chemin)}.")
+                return pd.read_parquet(chemin_cache)
+    except (OSError, ValueError):
+        pass # Cache absent, illisible ou périmé : relecture du fichier Excel
+    
+    df = pd.read_excel(chemin, engine=EXCEL_ENGINE, usecols=lambda nom: _normaliser_colonne(nom) in colonnes)
+    df.columns = [_normaliser_colonne(nom) for nom in df.columns]
+    df = df.astype({col: type_ for col, type_ in colonnes.items() if type_ and col in df.columns})
+    
+    try:
+        df.to_parquet(chemin_cache, compression='zstd')
+        with open(chemin_meta, 'w', encoding='utf-8') as f:
+            json.dump(signature, f)
+    except Exception as e:
+        # Ex: colonne aux types mélangés, non représentable en Parquet. L'import continue sans cache.
+        print(f"⚠️ Cache Parquet non écrit pour {os.path.basename(chemin)} : {e}")
+    
+    return df
+
 
 def safe_string(s):
     """Assure le nettoyage des chaînes de caractères."""
@@ -39,6 +196,16 @@ def safe_string(s):
     return s
 
 
+def safe_string_series(serie: pd.Series) -> pd.Series:
+    """
+    Version vectorisée de safe_string, appliquée à une colonne entière.
+    Les valeurs manquantes et les chaînes vides deviennent None.
+    """
+    serie = serie.astype('string').str.strip()
+    serie = serie.where(serie.str.len() > 0)
+    return serie.astype(object).where(serie.notna(), None)
+
+
 # ----------------------------------------------------------------------
 # GÉNÉRATION ET IMPORTATION DES DONNÉES DE RÉFÉRENCE FIXES
 # ----------------------------------------------------------------------
@@ -62,6 +229,12 @@ def _generate_annee_data(start_year: int = 2021, end_year: int = 2026) -> list:
         })
     return annee_list
 
+def _inserer_ignorer(session: Session, modele, records: list):
+    """Insère toutes les lignes en une seule instruction, en ignorant celles déjà présentes."""
+    if records:
+        session.execute(pg_insert(modele.__table__).values(records).on_conflict_do_nothing())
+
+
 def import_fixed_references(session: Session):
     """
     Insère les données de référence fixes (Cycles, Niveaux, Semestres, Types Inscription, Sessions, Types Formation, ANNEES UNIVERSITAIRES).
@@ -70,8 +243,7 @@ def import_fixed_references(session: Session):
     
     # 1. Cycles
     cycles_data = [{'code': 'L', 'label': 'Licence'}, {'code': 'M', 'label': 'Master'}, {'code': 'D', 'label': 'Doctorat'}]
-    for data in cycles_data:
-        session.merge(Cycle(**data))
+    _inserer_ignorer(session, Cycle, cycles_data)
     
     # 2. Niveaux et Semestres 
     niveau_semestre_map = {
@@ -80,26 +252,24 @@ def import_fixed_references(session: Session):
         'D1': ('D', ['S11', 'S12']), 'D2': ('D', ['S13', 'S14']), 'D3': ('D', ['S15', 'S16']),
     }
     
-    for niv_code, (cycle_code, sem_list) in niveau_semestre_map.items():
-        session.merge(Niveau(code=niv_code, label=niv_code, cycle_code=cycle_code))
-        
-        for sem_num in sem_list:
-            sem_code_complet = f"{niv_code}_{sem_num}" 
-            session.merge(Semestre(
-                code_semestre=sem_code_complet,
-                numero_semestre=sem_num,
-                niveau_code=niv_code 
-            ))
+    niveaux_data = [
+        {'code': niv_code, 'label': niv_code, 'cycle_code': cycle_code}
+        for niv_code, (cycle_code, _) in niveau_semestre_map.items()
+    ]
+    semestres_data = [
+        {'code_semestre': f"{niv_code}_{sem_num}", 'numero_semestre': sem_num, 'niveau_code': niv_code}
+        for niv_code, (_, sem_list) in niveau_semestre_map.items() for sem_num in sem_list
+    ]
+    _inserer_ignorer(session, Niveau, niveaux_data)
+    _inserer_ignorer(session, Semestre, semestres_data)
 
     # 3. Modes Inscription
     modes_inscription_data = [{'code': 'CLAS', 'label': 'Classique'}, {'code': 'HYB', 'label': 'Hybride'}]
-    for data in modes_inscription_data:
-        session.merge(ModeInscription(**data))
+    _inserer_ignorer(session, ModeInscription, modes_inscription_data)
         
     # 4. Insertion des Sessions d'Examen
     session_examen_data = [{'code_session': 'N', 'label': 'Normale'}, {'code_session': 'R', 'label': 'Rattrapage'}]
-    for sess in session_examen_data:
-        session.merge(SessionExamen(**sess))
+    _inserer_ignorer(session, SessionExamen, session_examen_data)
 
     # 5. Insertion des Types de Formation
     types_formation_data = [
@@ -107,13 +277,13 @@ def import_fixed_references(session: Session):
         {'code': 'FC', 'label': 'Formation Continue', 'description': 'Formation destinée aux professionnels en activité.'},
         {'code': 'FOAD', 'label': 'Formation à Distance', 'description': 'Formation ouverte à distance.'},
     ]
-    for data in types_formation_data:
-        session.merge(TypeFormation(**data))
+    _inserer_ignorer(session, TypeFormation, types_formation_data)
         
     # 6. Insertion des Années Universitaires
     annees_data = _generate_annee_data(start_year=2021, end_year=2026)
-    for data in annees_data:
-        session.merge(AnneeUniversitaire(**data))
+    _inserer_ignorer(session, AnneeUniversitaire, annees_data)
+    # Une partition par année pour les tables de faits partitionnées (notes, résultats UE, affectations)
+    database_setup.creer_partitions_annuelles(session, [annee['annee'] for annee in annees_data])
         
     session.commit()
     print("✅ Données de Référence LMD, Types, Sessions et Années Universitaires insérées.")
@@ -123,35 +293,45 @@ def import_fixed_references(session: Session):
 # FONCTIONS D'IMPORTATION UNITAIRE DE LA STRUCTURE ACADÉMIQUE
 # ----------------------------------------------------------------------
 
+def _filtrer_nouveaux(session: Session, df: pd.DataFrame, colonne: str, cle_modele) -> pd.DataFrame:
+    """Ne conserve que les lignes dont la clé n'existe pas encore en base (une seule requête)."""
+    existants = set(session.scalars(select(cle_modele)).all())
+    return df[~df[colonne].isin(existants)]
+
+
+def _chemin_logo(code: str):
+    """Retourne le chemin du logo (.jpg ou .png) associé à un code, ou None s'il n'existe pas."""
+    for ext in ['.jpg', '.png']:
+        potential_path = os.path.join(config.LOGO_FOLDER_PATH, f"{code}{ext}")
+        if os.path.exists(potential_path):
+            return potential_path
+    return None
+
+
 def _import_institutions(session: Session) -> bool:
     """Charge et importe la table Institution."""
     print("\n--- Importation des Institutions ---")
     try:
-        df_inst = pd.read_excel(config.INSTITUTION_FILE_PATH)
-        df_inst.columns = df_inst.columns.str.lower().str.replace(' ', '_')
+        df_inst = _lire_excel(config.INSTITUTION_FILE_PATH, DTYPES_EXCEL_INSTITUTIONS)
         df_inst = df_inst.where(pd.notnull(df_inst), None)
         
-        df_inst['institution_id'] = df_inst['institution_id'].astype(str).apply(safe_string)
+        df_inst['institution_id'] = safe_string_series(df_inst['institution_id'])
         # Gestion des doublons et des NaN
         df_inst_clean = df_inst.drop_duplicates(subset=['institution_id']).dropna(subset=['institution_id'])
         
-        for _, row in tqdm(df_inst_clean.iterrows(), total=len(df_inst_clean), desc="Institutions"):
-            inst_id = row['institution_id']
-            logo_path = None
-            
-            # Logique d'ajout du chemin du logo (inchangée)
-            logo_base_name = f"{inst_id}"
-            for ext in ['.jpg', '.png']:
-                potential_path = os.path.join(config.LOGO_FOLDER_PATH, logo_base_name + ext)
-                if os.path.exists(potential_path):
-                    logo_path = potential_path
-                    break 
-
-            session.merge(Institution(
-                id_institution=inst_id, 
-                nom=safe_string(row['institution_nom']),
-                type_institution=safe_string(row['institution_type']),
-                logo_path=logo_path 
+        # Colonnes renommées d'après les attributs du modèle : un seul to_dict('records') pour tout le lot
+        df_inst_clean = df_inst_clean.rename(columns={
+            'institution_id': 'id_institution', 'institution_nom': 'nom', 'institution_type': 'type_institution'
+        })[['id_institution', 'nom', 'type_institution']]
+        df_inst_clean[['nom', 'type_institution']] = df_inst_clean[['nom', 'type_institution']].apply(safe_string_series)
+        df_inst_clean['logo_path'] = df_inst_clean['id_institution'].map(_chemin_logo)
+        
+        # Upsert (équivalent du merge) : les institutions existantes sont mises à jour
+        if not df_inst_clean.empty:
+            stmt = pg_insert(Institution).values(_vers_records(df_inst_clean))
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=['id_institution'],
+                set_={col: stmt.excluded[col] for col in ['nom', 'type_institution', 'logo_path']}
             ))
         
         # 🚨 COMMIT CRITIQUE : Permet aux Composantes de voir les Institutions (Clé Étrangère)
@@ -168,15 +348,14 @@ def _import_institutions(session: Session) -> bool:
 def _load_and_clean_metadata():
     """Charge et nettoie le fichier de métadonnées académiques."""
     try:
-        df = pd.read_excel(config.METADATA_FILE_PATH)
-        df.columns = df.columns.str.lower().str.replace(' ', '_')
+        df = _lire_excel(config.METADATA_FILE_PATH, DTYPES_EXCEL_METADATA)
         df = df.where(pd.notnull(df), None)
         print(f"Fichier de métadonnées académiques chargé. {len(df)} lignes trouvées.")
         
         # Nettoyage et standardisation des clés
         for col in ['institution_id', 'composante', 'domaine', 'id_mention', 'id_parcours']:
              if col in df.columns:
-                 df[col] = df[col].astype(str).apply(safe_string)
+                 df[col] = safe_string_series(df[col])
         
         return df
         
@@ -195,25 +374,15 @@ def _import_composantes(session: Session, df: pd.DataFrame):
     # Filtrage des doublons sur la clé primaire/unique
     df_composantes = df[['composante', 'label_composante', 'institution_id']].drop_duplicates(
         subset=['composante']).dropna(subset=['composante', 'institution_id'])
+    df_composantes = _filtrer_nouveaux(session, df_composantes, 'composante', Composante.code)
     
-    for _, row in tqdm(df_composantes.iterrows(), total=len(df_composantes), desc="Composantes"):
-        composante_code = row['composante']
-        logo_path = None
-        
-        # Logique d'ajout du chemin du logo
-        logo_base_name = f"{composante_code}"
-        for ext in ['.jpg', '.png']:
-            potential_path = os.path.join(config.LOGO_FOLDER_PATH, logo_base_name + ext)
-            if os.path.exists(potential_path):
-                logo_path = potential_path
-                break 
-                
-        session.merge(Composante(
-            code=composante_code, 
-            label=safe_string(row['label_composante']),
-            id_institution=row['institution_id'],
-            logo_path=logo_path
-        ))
+    df_composantes = df_composantes.rename(columns={
+        'composante': 'code', 'label_composante': 'label', 'institution_id': 'id_institution'
+    })
+    df_composantes['label'] = safe_string_series(df_composantes['label'])
+    df_composantes['logo_path'] = df_composantes['code'].map(_chemin_logo)
+    
+    session.bulk_insert_mappings(Composante, _vers_records(df_composantes))
 
 
 def _import_domaines(session: Session, df: pd.DataFrame):
@@ -224,9 +393,11 @@ def _import_domaines(session: Session, df: pd.DataFrame):
           return
           
     df_domaines = df[['domaine', 'label_domaine']].drop_duplicates(subset=['domaine']).dropna(subset=['domaine'])
+    df_domaines = _filtrer_nouveaux(session, df_domaines, 'domaine', Domaine.code)
     
-    for _, row in tqdm(df_domaines.iterrows(), total=len(df_domaines), desc="Domaines"):
-        session.merge(Domaine(code=row['domaine'], label=safe_string(row['label_domaine'])))
+    df_domaines = df_domaines.rename(columns={'domaine': 'code', 'label_domaine': 'label'})
+    df_domaines['label'] = safe_string_series(df_domaines['label'])
+    session.bulk_insert_mappings(Domaine, _vers_records(df_domaines))
 
 
 def _import_mentions(session: Session, df: pd.DataFrame):
@@ -240,17 +411,29 @@ def _import_mentions(session: Session, df: pd.DataFrame):
     df_mentions_source = df[['mention', 'label_mention', 'id_mention', 'composante', 'domaine']].drop_duplicates(
         subset=['id_mention']).dropna(subset=['id_mention', 'composante', 'domaine', 'mention'])
     
-    for _, row in tqdm(df_mentions_source.iterrows(), total=len(df_mentions_source), desc="Mentions"):
-        session.merge(Mention(
-            id_mention=row['id_mention'], 
-            code_mention=safe_string(row['mention']),
-            label=safe_string(row['label_mention']),
-            composante_code=row['composante'], 
-            domaine_code=row['domaine']
-        ))
+    df_mentions = _filtrer_nouveaux(session, df_mentions_source, 'id_mention', Mention.id_mention)
+    
+    df_mentions = df_mentions.rename(columns={
+        'mention': 'code_mention', 'label_mention': 'label',
+        'composante': 'composante_code', 'domaine': 'domaine_code',
+    })
+    for col in ['code_mention', 'label']:
+        df_mentions[col] = safe_string_series(df_mentions[col])
+    session.bulk_insert_mappings(Mention, _vers_records(df_mentions))
     return df_mentions_source 
 
 
+def _vers_date_parcours(serie: pd.Series) -> pd.Series:
+    """
+    Convertit les dates de création/fin d'un parcours (année AAAA ou entier AAAAMMJJ) en dates.
+    Une année seule devient le 1er janvier ; toute autre valeur devient None.
+    """
+    nombres = pd.to_numeric(serie, errors='coerce').round()
+    nombres = nombres.where(nombres >= 10_000_000, nombres * 10_000 + 101) # AAAA -> AAAA0101
+    dates = pd.to_datetime(nombres.astype('Int64').astype('string'), format='%Y%m%d', errors='coerce')
+    return dates.dt.date.astype(object).where(dates.notna(), None)
+
+
 def _import_parcours(session: Session, df: pd.DataFrame, df_mentions_source: pd.DataFrame):
     """Importe les Parcours (dépend de Mention)."""
     print("\n--- Importation des Parcours ---")
@@ -262,21 +445,33 @@ def _import_parcours(session: Session, df: pd.DataFrame, df_mentions_source: pd.
     df_parcours = df[['id_parcours', 'parcours', 'label_parcours', 'id_mention', 'date_creation', 'date_fin']].copy()
     
     df_parcours = df_parcours.drop_duplicates(subset=['id_parcours'], keep='first').dropna(subset=['id_parcours', 'id_mention', 'parcours'])
+    df_parcours = _filtrer_nouveaux(session, df_parcours, 'id_parcours', Parcours.id_parcours)
 
-    for _, row in tqdm(df_parcours.iterrows(), total=len(df_parcours), desc="Parcours"):
-        
-        # Le type Integer pour date_creation/fin est conservé
-        date_creation_val = int(row['date_creation']) if pd.notna(row['date_creation']) and row['date_creation'] is not None else None
-        date_fin_val = int(row['date_fin']) if pd.notna(row['date_fin']) and row['date_fin'] is not None else None
-        
-        session.merge(Parcours(
-            id_parcours=row['id_parcours'], 
-            code_parcours=safe_string(row['parcours']), 
-            label=safe_string(row['label_parcours']),
-            mention_id=row['id_mention'], 
-            date_creation=date_creation_val,
-            date_fin=date_fin_val
-        ))
+    df_parcours = df_parcours.rename(columns={
+        'parcours': 'code_parcours', 'label_parcours': 'label', 'id_mention': 'mention_id',
+    })
+    for col in ['code_parcours', 'label']:
+        df_parcours[col] = safe_string_series(df_parcours[col])
+    for col in ['date_creation', 'date_fin']:
+        df_parcours[col] = _vers_date_parcours(df_parcours[col])
+    
+    session.bulk_insert_mappings(Parcours, _vers_records(df_parcours))
+
+
+def _importer_dans_session_dediee(fonction_import, df: pd.DataFrame):
+    """
+    Exécute `fonction_import(session, df)` sur une session dédiée puis la commite.
+    Les sessions SQLAlchemy n'étant pas thread-safe, chaque thread ouvre la sienne.
+    """
+    session = database_setup.get_session()
+    try:
+        fonction_import(session, df)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
 
 
 def import_metadata_to_db(session: Session):
@@ -294,9 +489,16 @@ def import_metadata_to_db(session: Session):
         if df_metadata is None:
             return
         
-        # Le reste des tables dépend de l'institution déjà commitée
-        _import_composantes(session, df_metadata) 
-        _import_domaines(session, df_metadata)
+        # Le reste des tables dépend de l'institution déjà commitée.
+        # Composantes et Domaines sont indépendants : importés en parallèle, chacun sur sa propre session
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(_importer_dans_session_dediee, fonction_import, df_metadata)
+                for fonction_import in (_import_composantes, _import_domaines)
+            ]
+            wait(futures)
+        for future in futures:
+            future.result() # Propage une éventuelle erreur d'un des imports
         
         df_mentions_source = _import_mentions(session, df_metadata) 
 
@@ -317,12 +519,12 @@ def import_metadata_to_db(session: Session):
 def _load_and_clean_inscriptions():
     """Charge, nettoie et enrichit le fichier d'inscriptions."""
     try:
-        df = pd.read_excel(config.INSCRIPTION_FILE_PATH)
-        df.columns = df.columns.str.lower().str.replace(' ', '_')
+        df = _lire_excel(config.INSCRIPTION_FILE_PATH, DTYPES_EXCEL_INSCRIPTIONS)
         
         date_cols = ['naissance_date', 'cin_date']
         for col in date_cols:
-            df[col] = pd.to_datetime(df[col], errors='coerce', dayfirst=True).dt.date
+            # Format explicite : évite l'inférence du format date par date
+            df[col] = pd.to_datetime(df[col], errors='coerce', format='%d/%m/%Y').dt.date
             
         df = df.where(pd.notnull(df), None) 
         print(f"Fichier XLSX d'inscriptions chargé. {len(df)} lignes trouvées.")
@@ -331,7 +533,7 @@ def _load_and_clean_inscriptions():
         if 'id_parcours_caractere' in df.columns:
              df.rename(columns={'id_parcours_caractere': 'id_parcours'}, inplace=True) 
         if 'id_parcours' in df.columns:
-             df['id_parcours'] = df['id_parcours'].astype(str).apply(safe_string) 
+             df['id_parcours'] = safe_string_series(df['id_parcours'])
 
         if 'semestre_id' in df.columns:
             df.rename(columns={'semestre_id': 'code_semestre'}, inplace=True) 
@@ -343,15 +545,13 @@ def _load_and_clean_inscriptions():
              
         # 1. Nettoyage/Enrichissement du code_semestre (Doit être L1_S01)
         if 'code_semestre' in df.columns and 'niveau_code' in df.columns:
-             df['code_semestre'] = df['code_semestre'].astype(str).apply(safe_string)
-             df['niveau_code'] = df['niveau_code'].astype(str).apply(safe_string)
-             df['code_semestre'] = df.apply(
-                 lambda row: f"{row['niveau_code']}_{row['code_semestre']}" 
-                 if pd.notna(row.get('niveau_code')) 
-                 and row['code_semestre']
-                 and '_' not in str(row['code_semestre'])
-                 else row['code_semestre'], 
-                 axis=1
+             df['niveau_code'] = safe_string_series(df['niveau_code'])
+             ns = safe_string_series(df['code_semestre']).astype('string')
+             nv = df['niveau_code'].astype('string')
+             # Préfixe le niveau uniquement lorsque le code n'est pas déjà complet (S01 -> L1_S01)
+             needs_prefix = ns.notna() & nv.notna() & ~ns.str.contains('_', na=False)
+             df['code_semestre'] = safe_string_series(
+                 pd.Series(np.where(needs_prefix, nv.str.cat(ns, sep='_'), ns), index=df.index)
              )
 
         # 2. Standardisation du Mode Inscription
@@ -359,16 +559,15 @@ def _load_and_clean_inscriptions():
              df.rename(columns={'type_formation': 'code_mode_inscription'}, inplace=True)
              
         if 'code_mode_inscription' in df.columns: 
-             df.loc[:, 'code_mode_inscription'] = df['code_mode_inscription'].astype(str).str.upper().replace({ 
-                 'CLASSIQUE': 'CLAS', 'HYBRIDE': 'HYB'
-             })
-             df['code_mode_inscription'] = df['code_mode_inscription'].astype(str).apply(safe_string)
+             modes = safe_string_series(df['code_mode_inscription']).str.upper()
+             modes = modes.map({'CLASSIQUE': 'CLAS', 'HYBRIDE': 'HYB'}).fillna(modes)
+             df['code_mode_inscription'] = modes.where(modes.notna(), None)
         else:
              df['code_mode_inscription'] = 'CLAS' 
 
         # 3. Standardisation du Type de Formation
         if 'type_formation_code' in df.columns:
-             df['code_type_formation'] = df['type_formation_code'].astype(str).apply(safe_string)
+             df['code_type_formation'] = safe_string_series(df['type_formation_code'])
         else:
              df['code_type_formation'] = 'FI'
              
@@ -378,112 +577,331 @@ def _load_and_clean_inscriptions():
         print(f"❌ ERREUR: Impossible de lire ou de nettoyer le fichier d'inscriptions. {e}", file=sys.stderr)
         return None
 
-def _import_etudiants(session: Session, df: pd.DataFrame):
-    """Importe les Étudiants (commit par ligne pour la gestion d'erreurs individuelles)."""
-    print("\n--- Importation des Étudiants (Ligne par Ligne) ---")
+def _copy_dataframe(session: Session, nom_table: str, df: pd.DataFrame):
+    """Charge `df` dans `nom_table` via COPY FROM STDIN, dans la transaction de la session."""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, sep='\t', na_rep='\\N')
+    buffer.seek(0)
+    
+    # COPY passe par le curseur DBAPI brut (psycopg2)
+    with session.connection().connection.cursor() as curseur:
+        curseur.copy_expert(
+            f"COPY {nom_table} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv, DELIMITER E'\\t', NULL '\\N')", buffer
+        )
+
+
+def _copy_upsert(session: Session, table, df: pd.DataFrame, cle: str):
+    """
+    Charge `df` dans une table temporaire via COPY FROM STDIN, puis la fusionne
+    dans `table` avec un unique INSERT ... SELECT ... ON CONFLICT DO UPDATE.
+    """
+    staging = f"{table.name}_staging"
+    colonnes = ', '.join(df.columns)
+    maj = ', '.join(f"{col} = EXCLUDED.{col}" for col in df.columns if col != cle)
+    
+    session.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+    session.execute(text(f"CREATE TEMP TABLE {staging} (LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DROP"))
+    _copy_dataframe(session, staging, df)
+    
+    session.execute(text(
+        f"INSERT INTO {table.name} ({colonnes}) SELECT {colonnes} FROM {staging} "
+        f"ON CONFLICT ({cle}) DO UPDATE SET {maj}"
+    ))
+
+
+def _charger_etudiants(session: Session, df: pd.DataFrame, codes_existants: set) -> list:
+    """
+    Charge un lot d'étudiants nettoyés : les nouveaux par COPY, les existants par UPDATE groupé.
+    Retourne les codes nouvellement insérés.
+    """
+    masque_nouveaux = ~df['code_etudiant'].isin(codes_existants)
+    df_nouveaux = df[masque_nouveaux]
+    df_maj = df[~masque_nouveaux]
     
+    _copy_dataframe(session, Etudiant.__tablename__, df_nouveaux)
+    session.bulk_update_mappings(Etudiant, _vers_records(df_maj))
+    return df_nouveaux['code_etudiant'].tolist()
+
+
+def _import_etudiants(session: Session, df: pd.DataFrame, codes_existants: set) -> tuple:
+    """
+    Importe les Étudiants par lots de TAILLE_LOT_ETUDIANTS, chacun dans un SAVEPOINT et commité.
+    Un lot rejeté est rejoué ligne par ligne (un SAVEPOINT par ligne) pour isoler les lignes fautives.
+    `codes_existants` (codes déjà en base) est tenu à jour au fil des lots.
+    Retourne le nombre d'étudiants distincts traités et le nombre d'erreurs.
+    """
     df_etudiants = df.drop_duplicates(subset=['code_etudiant']).dropna(subset=['code_etudiant', 'nom'])
+    
+    df_copy = df_etudiants.reindex(columns=COLONNES_ETUDIANT)
+    if 'sexe' not in df_etudiants.columns:
+        df_copy['sexe'] = 'Autre'
+    for col in COLONNES_ETUDIANT:
+        if col in ('naissance_date', 'cin_date', 'bacc_annee'):
+            continue
+        df_copy[col] = safe_string_series(df_copy[col])
+    
     etudiant_errors = 0
     
-    for index, row in tqdm(df_etudiants.iterrows(), total=len(df_etudiants), desc="Import Etudiants"):
-        code_etudiant = row.get('code_etudiant', 'N/A')
+    for debut in range(0, len(df_copy), TAILLE_LOT_ETUDIANTS):
+        lot = df_copy.iloc[debut:debut + TAILLE_LOT_ETUDIANTS]
         
         try:
-            naissance_date_val = row['naissance_date'] if isinstance(row['naissance_date'], date) else None
-            cin_date_val = row['cin_date'] if isinstance(row['cin_date'], date) else None
-            
-            session.merge(Etudiant(
-                code_etudiant=safe_string(code_etudiant), 
-                numero_inscription=safe_string(row.get('numero_inscription')),
-                nom=safe_string(row['nom']), 
-                prenoms=safe_string(row['prenoms']),
-                sexe=safe_string(row.get('sexe', 'Autre')), 
-                naissance_date=naissance_date_val, 
-                naissance_lieu=safe_string(row.get('naissance_lieu')),
-                nationalite=safe_string(row.get('nationalite')),
-                bacc_annee=int(row['bacc_annee']) if pd.notna(row['bacc_annee']) and row['bacc_annee'] is not None else None,
-                bacc_serie=safe_string(row.get('bacc_serie')), 
-                bacc_centre=safe_string(row.get('bacc_centre')),
-                adresse=safe_string(row.get('adresse')), 
-                telephone=safe_string(row.get('telephone')), 
-                mail=safe_string(row.get('mail')),
-                cin=safe_string(row.get('cin')), 
-                cin_date=cin_date_val, 
-                cin_lieu=safe_string(row.get('cin_lieu'))
-            ))
-            
-            # Commit individuel pour isoler les erreurs d'étudiants
+            with session.begin_nested():
+                nouveaux = _charger_etudiants(session, lot, codes_existants)
+            codes_existants.update(nouveaux)
             session.commit()
+            continue
+        except Exception:
+            # Seuls les lots pathologiques paient le coût du traitement ligne par ligne
+            pass
+        
+        echecs = []
+        for position in range(len(lot)):
+            ligne = lot.iloc[[position]]
+            index = ligne.index[0]
+            code_etudiant = ligne['code_etudiant'].iloc[0]
             
-        except Exception as e:
-            session.rollback()
-            etudiant_errors += 1
-            e_msg = str(e.orig).lower() if hasattr(e, 'orig') and e.orig else str(e)
-            
-            print(f"❌ [ETUDIANT] Ligne Excel {row.name} ({code_etudiant}) - ERREUR: {e_msg.splitlines()[0]}")
-            logging.error(f"ETUDIANT: {code_etudiant} | Erreur: {e_msg} | LIGNE_EXCEL_IDX: {row.name}")
-            
-    print(f"\n✅ Insertion des étudiants terminée. {etudiant_errors} erreur(s) individuelle(s) détectée(s).")
+            try:
+                with session.begin_nested():
+                    nouveaux = _charger_etudiants(session, ligne, codes_existants)
+                codes_existants.update(nouveaux)
+            except Exception as e:
+                etudiant_errors += 1
+                e_msg = str(e.orig).lower() if hasattr(e, 'orig') and e.orig else str(e)
+                
+                print(f"❌ [ETUDIANT] Ligne Excel {index} ({code_etudiant}) - ERREUR: {e_msg.splitlines()[0]}")
+                echecs.append(f"ETUDIANT: {code_etudiant} | Erreur: {e_msg} | LIGNE_EXCEL_IDX: {index}")
+        
+        _journaliser_erreurs(echecs)
+        session.commit()
+    
+    return len(df_copy), etudiant_errors
 
 
-def _import_inscriptions(session: Session, df: pd.DataFrame):
-    """Importe les Inscriptions (commit par lot)."""
-    print("\n--- Importation des Inscriptions ---")
-    
-    cles_requises = ['code_inscription', 'code_etudiant', 'annee_universitaire', 'id_parcours', 'code_semestre', 'code_mode_inscription'] 
-    df_inscriptions = df.dropna(subset=cles_requises)
+def _upsert_inscriptions(session: Session, records: list):
+    """Insère ou met à jour un lot d'inscriptions (executemany sur l'instruction pré-construite)."""
+    session.execute(_INSCRIPTION_UPSERT, records)
+
+
+def _upsert_inscriptions_par_lots(session: Session, df_inscriptions: pd.DataFrame) -> tuple:
+    """
+    Upsert des inscriptions par lots de TAILLE_LOT ; un lot rejeté est rejoué ligne
+    par ligne pour isoler et journaliser les lignes fautives.
+    Retourne les compteurs d'erreurs (clé étrangère, unicité, données, autres).
+    """
+    records = _vers_records(df_inscriptions[COLONNES_COPY_INSCRIPTION])
+    index_lignes = df_inscriptions.index.tolist()
     
     errors_fk, errors_uq, errors_data, errors_other = 0, 0, 0, 0
     
-    for index, row in tqdm(df_inscriptions.iterrows(), total=len(df_inscriptions), desc="Import Inscriptions"):
-        code_inscription = row.get('code_inscription', 'N/A')
+    for debut in tqdm(range(0, len(records), TAILLE_LOT), desc="Import Inscriptions"):
+        lot = records[debut:debut + TAILLE_LOT]
         
         try:
-            session.merge(Inscription(
-                code_inscription=safe_string(code_inscription), 
-                code_etudiant=safe_string(row['code_etudiant']), 
-                annee_universitaire=safe_string(row['annee_universitaire']), 
-                id_parcours=row['id_parcours'], 
-                code_semestre=safe_string(row['code_semestre']), 
-                code_mode_inscription=safe_string(row.get('code_mode_inscription', 'CLAS')), 
-            ))
+            with session.begin_nested():
+                _upsert_inscriptions(session, lot)
+            continue
+        except (IntegrityError, DataError):
+            # Le lot est rejeté en bloc : on le rejoue ligne par ligne pour isoler les lignes fautives
+            pass
+        
+        echecs = []
+        for record, index in zip(lot, index_lignes[debut:debut + TAILLE_LOT]):
+            code_inscription = record['code_inscription']
             
-            if (index + 1) % 500 == 0:
-                session.commit()
-                
-        # Gestion des erreurs (inchangée) 
-        except IntegrityError as e:
-            session.rollback()
-            e_msg = str(e.orig).lower()
-            if "violates foreign key constraint" in e_msg: errors_fk += 1
-            elif "violates unique constraint" in e_msg or "violates not null constraint" in e_msg: errors_uq += 1
-            else: errors_other += 1
-            logging.error(f"INSCRIPTION (Intégrité): {code_inscription} | Détail: {e.orig} | LIGNE_EXCEL_IDX: {row.name}")
-        except DataError as e:
-            session.rollback()
-            errors_data += 1
-            logging.error(f"INSCRIPTION (Données): {code_inscription} | Détail: {e.orig} | LIGNE_EXCEL_IDX: {row.name}")
-        except Exception as e:
-            session.rollback()
-            errors_other += 1
-            logging.error(f"INSCRIPTION (Autre): {code_inscription} | Erreur: {e} | LIGNE_EXCEL_IDX: {row.name}")
+            try:
+                with session.begin_nested():
+                    _upsert_inscriptions(session, [record])
+                    
+            # Classement par code SQLSTATE (indépendant de la langue des messages du serveur)
+            except (IntegrityError, DataError) as e:
+                code = getattr(e.orig, 'pgcode', '')
+                if code == PGCODE_CLE_ETRANGERE: errors_fk += 1
+                elif code in PGCODES_UNICITE: errors_uq += 1
+                elif code in PGCODES_DONNEES: errors_data += 1
+                else: errors_other += 1
+                type_erreur = "Données" if isinstance(e, DataError) else "Intégrité"
+                echecs.append(f"INSCRIPTION ({type_erreur}): {code_inscription} | Détail: {e.orig} | LIGNE_EXCEL_IDX: {index}")
+            except Exception as e:
+                errors_other += 1
+                echecs.append(f"INSCRIPTION (Autre): {code_inscription} | Erreur: {e} | LIGNE_EXCEL_IDX: {index}")
+        
+        _journaliser_erreurs(echecs)
+    
+    return errors_fk, errors_uq, errors_data, errors_other
+
+
+def _charger_cles_references(session: Session) -> dict:
+    """Charge une fois les clés des tables référencées par Inscription, indexées par colonne du fichier."""
+    return {
+        'annee_universitaire': set(session.scalars(select(AnneeUniversitaire.annee)).all()),
+        'id_parcours': set(session.scalars(select(Parcours.id_parcours)).all()),
+        'code_semestre': set(session.scalars(select(Semestre.code_semestre)).all()),
+        'code_mode_inscription': set(session.scalars(select(ModeInscription.code)).all()),
+    }
+
+
+def _import_inscriptions(session: Session, df: pd.DataFrame, cles_references: dict, codes_etudiants: set) -> tuple:
+    """
+    Importe les Inscriptions en masse (COPY), avec repli sur l'upsert par lots.
+    Les lignes dont une clé étrangère est absente des référentiels sont écartées
+    et journalisées avant tout envoi à la base.
+    Retourne les compteurs d'erreurs (clé étrangère, unicité, données, autres).
+    """
+    df_inscriptions = df[COLONNES_COPY_INSCRIPTION].apply(safe_string_series).dropna(subset=COLONNES_COPY_INSCRIPTION)
+    # Un même code ne peut apparaître qu'une fois par INSERT ... ON CONFLICT : on garde la dernière ligne, comme le merge
+    df_inscriptions = df_inscriptions.drop_duplicates(subset=['code_inscription'], keep='last')
+    
+    errors_fk, errors_uq, errors_data, errors_other = 0, 0, 0, 0
+    
+    # Validation des clés étrangères en une passe vectorisée
+    cles_fk = {'code_etudiant': codes_etudiants, **cles_references}
+    absentes = pd.DataFrame({col: ~df_inscriptions[col].isin(cles) for col, cles in cles_fk.items()})
+    valides = ~absentes.any(axis=1)
+    
+    if not valides.all():
+        errors_fk += int((~valides).sum())
+        messages = []
+        for ligne, absente in zip(df_inscriptions[~valides].itertuples(), absentes[~valides].itertuples(index=False)):
+            cles = ', '.join(f"{col}={getattr(ligne, col)}" for col, manque in zip(cles_fk, absente) if manque)
+            messages.append(f"INSCRIPTION (Clé étrangère): {ligne.code_inscription} | Clé(s) absente(s): {cles} | LIGNE_EXCEL_IDX: {ligne.Index}")
+        _journaliser_erreurs(messages)
+        df_inscriptions = df_inscriptions[valides]
+    
+    try:
+        with session.begin_nested():
+            _copy_upsert(session, Inscription.__table__, df_inscriptions, 'code_inscription')
+    except Exception as e:
+        # Au moins une ligne est invalide (clé étrangère absente, etc.) : l'upsert par lots isole les fautives
+        print(f"⚠️ COPY des inscriptions rejeté ({str(e).splitlines()[0]}). Repli sur l'upsert par lots.")
+        fk, errors_uq, errors_data, errors_other = _upsert_inscriptions_par_lots(session, df_inscriptions)
+        errors_fk += fk
+    
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"\n❌ ERREUR CRITIQUE PENDANT LE COMMIT DU LOT: {e}", file=sys.stderr)
+        errors_other += len(df_inscriptions)
+    
+    return errors_fk, errors_uq, errors_data, errors_other
+
+
+def _ecrire_parquet_inscriptions(df: pd.DataFrame):
+    """
+    Écrit les inscriptions nettoyées dans le fichier Parquet intermédiaire,
+    relu ensuite par lots pour limiter la mémoire occupée pendant l'import.
+    """
+    df = df.drop_duplicates()
+    # Parquet impose un type par colonne : les colonnes texte mixtes (ex: téléphone numérique) sont forcées en chaîne
+    colonnes_texte = [
+        col for col in df.columns 
+        if df[col].dtype == object and col not in ('naissance_date', 'cin_date', 'bacc_annee')
+    ]
+    df = df.astype({col: 'string' for col in colonnes_texte})
+    # Année du bac normalisée avant l'écriture : une cellule non numérique devient NA au lieu de faire
+    # échouer pyarrow (et tout l'import) sur une colonne mêlant entiers et texte
+    if 'bacc_annee' in df.columns:
+        df['bacc_annee'] = pd.to_numeric(df['bacc_annee'], errors='coerce').astype('Int64')
+    # L'index (ligne Excel d'origine, journalisée en LIGNE_EXCEL_IDX) est écrit comme une vraie colonne :
+    # un RangeIndex ne serait conservé qu'en métadonnées, perdues lors de la relecture par lots
+    df = df.rename_axis(COLONNE_LIGNE_EXCEL).reset_index()
+    df.to_parquet(config.INSCRIPTION_PARQUET_PATH, index=False, compression='zstd', row_group_size=50_000)
+
+
+def _lire_lots_inscriptions(taille_lot: int = TAILLE_LOT):
+    """Itère sur le fichier Parquet intermédiaire des inscriptions, un DataFrame par lot."""
+    fichier = pq.ParquetFile(config.INSCRIPTION_PARQUET_PATH)
+    nb_lots = math.ceil(fichier.metadata.num_rows / taille_lot)
+    
+    for lot in tqdm(fichier.iter_batches(batch_size=taille_lot), total=nb_lots, desc="Lots d'inscriptions"):
+        # Chaque lot retrouve l'index d'origine (LIGNE_EXCEL_IDX) depuis la colonne dédiée
+        yield lot.to_pandas().set_index(COLONNE_LIGNE_EXCEL).rename_axis(None)
+
+
+def _suspendre_contraintes(session: Session) -> list:
+    """
+    Mode --bulk : désactive les triggers de clés étrangères pour la connexion courante
+    et supprime les index secondaires (hors clés primaires/uniques) des tables chargées.
+    Retourne les définitions des index supprimés, à recréer après le chargement.
+    """
+    session.execute(text("SET session_replication_role = 'replica'"))
+    index_secondaires = session.execute(
+        text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename IN :tables "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint)"
+        ).bindparams(bindparam('tables', expanding=True)),
+        {'tables': TABLES_CHARGEMENT_BULK}
+    ).all()
+    
+    for nom_index, _ in index_secondaires:
+        session.execute(text(f'DROP INDEX IF EXISTS "{nom_index}"'))
+    session.commit()
     
+    print(f"Mode bulk : clés étrangères suspendues, {len(index_secondaires)} index secondaire(s) supprimé(s).")
+    return [definition for _, definition in index_secondaires]
+
+
+def _restaurer_contraintes(session: Session, connexion, definitions_index: list):
+    """
+    Recrée les index supprimés par _suspendre_contraintes (construction triée en une passe) et réactive les triggers.
+    Le rôle 'origin' est rétabli même si la recréation échoue ; si c'est impossible, la connexion est
+    invalidée pour ne jamais retourner au pool avec les clés étrangères désactivées.
+    """
+    session.rollback()
     try:
+        for definition in definitions_index:
+            session.execute(text(definition))
         session.commit()
-        print("\n✅ Importation des inscriptions terminée.")
+    except Exception:
+        print("❌ Mode bulk : échec de la recréation des index. Définitions à rejouer :\n" + "\n".join(definitions_index), file=sys.stderr)
+        raise
+    finally:
+        try:
+            session.rollback()
+            session.execute(text("SET session_replication_role = 'origin'"))
+            session.commit()
+        except Exception:
+            connexion.invalidate()
+            raise
+    print(f"Mode bulk : {len(definitions_index)} index recréé(s), clés étrangères réactivées.")
+
+
+def _importer_lots_inscriptions(session: Session):
+    """Importe Étudiants puis Inscriptions lot par lot depuis le Parquet intermédiaire."""
+    try:
+        print("\n--- Importation des Étudiants et des Inscriptions (par lots) ---")
+        nb_etudiants, etudiant_errors = 0, 0
+        codes_etudiants = set(session.scalars(select(Etudiant.code_etudiant)).all())
+        cles_references = _charger_cles_references(session)
+        errors_fk, errors_uq, errors_data, errors_other = 0, 0, 0, 0
+        
+        for df_lot in _lire_lots_inscriptions():
+            nb, erreurs = _import_etudiants(session, df_lot, codes_etudiants)
+            nb_etudiants, etudiant_errors = nb_etudiants + nb, etudiant_errors + erreurs
+            fk, uq, data, other = _import_inscriptions(session, df_lot, cles_references, codes_etudiants)
+            errors_fk, errors_uq, errors_data, errors_other = errors_fk + fk, errors_uq + uq, errors_data + data, errors_other + other
+            
+            del df_lot
+            gc.collect()
+        
+        print(f"\n✅ Importation de {nb_etudiants} étudiants et des inscriptions terminée.")
+        print(f"{etudiant_errors} erreur(s) individuelle(s) détectée(s) sur les étudiants.")
         print(f"\n--- Récapitulatif des erreurs d'insertion ---")
         print(f"Erreurs Clé Étrangère/Unique: {errors_fk + errors_uq}")
         print(f"Erreurs Format de Données: {errors_data}")
         print(f"Autres erreurs: {errors_other}")
         print(f"Voir 'import_errors.log' pour les détails complets.")
+
     except Exception as e:
-        session.rollback()
-        print(f"\n❌ ERREUR CRITIQUE PENDANT LE COMMIT FINAL: {e}", file=sys.stderr)
+        print(f"\n❌ ERREUR dans l'orchestrateur d'inscriptions : {e}", file=sys.stderr)
 
 
-def import_inscriptions_to_db(session: Session):
+def import_inscriptions_to_db(session: Session, bulk: bool = False):
     """
     Orchestre l'importation des données des étudiants et des inscriptions.
+    En mode `bulk`, les clés étrangères et les index secondaires sont suspendus pendant le chargement.
     """
     print(f"\n--- 3. Démarrage de l'importation des inscriptions et étudiants ---")
     
@@ -492,13 +910,35 @@ def import_inscriptions_to_db(session: Session):
     if df_inscriptions is None:
         print("❌ Importation des inscriptions annulée.")
         return
-        
+    
     try:
-        _import_etudiants(session, df_inscriptions)
-        _import_inscriptions(session, df_inscriptions)
-
+        _ecrire_parquet_inscriptions(df_inscriptions)
     except Exception as e:
-        print(f"\n❌ ERREUR dans l'orchestrateur d'inscriptions : {e}", file=sys.stderr)
+        print(f"❌ ERREUR: Impossible d'écrire le fichier Parquet intermédiaire. {e}", file=sys.stderr)
+        return
+    
+    # Seuls les lots relus depuis le Parquet restent ensuite en mémoire
+    del df_inscriptions
+    gc.collect()
+    
+    if not bulk:
+        _importer_lots_inscriptions(session)
+        return
+    
+    # session_replication_role est un réglage de connexion : tout le chargement
+    # doit passer par la même connexion, malgré les commits par lot
+    with database_setup.engine.connect() as connexion:
+        session_bulk = Session(bind=connexion)
+        definitions_index = []
+        try:
+            definitions_index = _suspendre_contraintes(session_bulk)
+            _importer_lots_inscriptions(session_bulk)
+        finally:
+            try:
+                # Aussi après un échec de _suspendre_contraintes : le rôle 'replica' a pu être posé
+                _restaurer_contraintes(session_bulk, connexion, definitions_index)
+            finally:
+                session_bulk.close()
 
 
 # ----------------------------------------------------------------------
@@ -553,14 +993,21 @@ def _deduce_parcours_niveaux(session: Session):
             niveaux_tries = sorted(niveaux, key=lambda n: NIVEAU_ORDRE.get(n, 99))
             
             for index, niv_code in enumerate(niveaux_tries):
-                records_to_insert.append(ParcoursNiveau(
-                    id_parcours=parcours_id,
-                    code_niveau=niv_code,
-                    ordre_niveau_parcours=index + 1 
-                ))
-
-        # 3. Insertion en lot
-        session.bulk_save_objects(records_to_insert)
+                records_to_insert.append({
+                    'id_parcours': parcours_id,
+                    'code_niveau': niv_code,
+                    'ordre_niveau_parcours': index + 1 
+                })
+
+        # 3. Insertion en lot (executemany par paquets de TAILLE_LOT_PARCOURS_NIVEAUX) ; 
+        # une liaison déjà présente (ré-exécution) voit seulement son ordre mis à jour
+        stmt = pg_insert(ParcoursNiveau.__table__)
+        stmt = stmt.on_conflict_do_update(
+            constraint='uq_parcours_niveau_unique',
+            set_={'ordre_niveau_parcours': stmt.excluded.ordre_niveau_parcours}
+        )
+        for debut in range(0, len(records_to_insert), TAILLE_LOT_PARCOURS_NIVEAUX):
+            session.execute(stmt, records_to_insert[debut:debut + TAILLE_LOT_PARCOURS_NIVEAUX])
         session.commit()
         print(f"✅ Insertion de {len(records_to_insert)} liaisons ParcoursNiveau terminée.")
 
@@ -574,9 +1021,10 @@ def _deduce_parcours_niveaux(session: Session):
 # BLOC PRINCIPAL ET ORCHESTRATEUR GLOBAL MIS À JOUR
 # ----------------------------------------------------------------------
 
-def import_all_data():
+def import_all_data(bulk: bool = False):
     """
     Orchestre l'ensemble des étapes d'importation.
+    `bulk` active le chargement en masse des inscriptions (voir import_inscriptions_to_db).
     """
     print("=====================================================")
     print("🚀 DÉMARRAGE DU PROCESSUS D'IMPORTATION DE DONNÉES 🚀")
@@ -592,11 +1040,15 @@ def import_all_data():
         import_metadata_to_db(session) 
         
         # 3. Importation des étudiants et des inscriptions
-        import_inscriptions_to_db(session)
+        import_inscriptions_to_db(session, bulk=bulk)
         
         # 4. 🆕 DÉDUCTION ET INSERTION DE LA STRUCTURE TRANSVERSALE
         _deduce_parcours_niveaux(session)
         
+        # 5. Rafraîchissement des tables et vues matérialisées de consultation
+        database_setup.rafraichir_vue_resultats(session)
+        database_setup.rafraichir_vues_materialisees(session)
+        
         # Un commit final si tout s'est bien passé dans les orchestrateurs
         session.commit() # Les sous-fonctions ont géré les commits nécessaires
 
@@ -1,5 +1,6 @@
 # main.py
 
+import argparse
 import database_setup
 import import_data
 import sys
@@ -14,12 +15,20 @@ except Exception:
     pass
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Initialisation de la BDD et importation des données de scolarité.")
+    parser.add_argument(
+        '--bulk', action='store_true',
+        help="Chargement en masse des inscriptions : clés étrangères et index secondaires suspendus pendant l'import."
+    )
+    args = parser.parse_args()
+    
     # 1. Initialisation de la BDD et des tables
     database_setup.init_db()
+    database_setup.prechauffer_cache()
     
     # 2. Appel de l'orchestrateur global d'importation
     # Ceci remplace les appels individuels : import_fixed_references(), 
     # import_metadata_to_db(), et import_inscriptions_to_db().
-    import_data.import_all_data()
+    import_data.import_all_data(bulk=args.bulk)
     
     print("\nProcessus d'initialisation et d'importation terminé.")
\ No newline at end of file
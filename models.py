@@ -1,14 +1,57 @@
 # models.py
 
 from sqlalchemy import (
-    Column, Integer, String, Date, Numeric, ForeignKey, 
-    UniqueConstraint, Text, Boolean, CheckConstraint 
+    Column, Integer, SmallInteger, BigInteger, Identity, Sequence, String, Date, Numeric, ForeignKey, Enum, 
+    UniqueConstraint, Text, Boolean, Index, event, text, DDL, TypeDecorator 
 )
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.orm import relationship, declarative_base, deferred
+from sqlalchemy.ext.associationproxy import association_proxy
+from decimal import Decimal
 
 # Définition de la base déclarative pour SQLAlchemy
 Base = declarative_base()
 
+def colonne_id_sequence(nom_sequence: str) -> Column:
+    """
+    Clé primaire BigInteger alimentée par une séquence dédiée (cache=1000). Équivalent d'Identity
+    pour les tables partitionnées, qui n'acceptent pas de colonne IDENTITY avant PostgreSQL 17.
+    La clé primaire de ces tables étant composite (id + année), la colonne est déclarée sentinelle
+    d'insertion : les flush ORM restent regroupés en INSERT ... VALUES multi-lignes (insertmanyvalues).
+    """
+    sequence = Sequence(nom_sequence, cache=1000)
+    return Column(BigInteger, sequence, server_default=sequence.next_value(),
+                  primary_key=True, autoincrement=True, insert_sentinel=True)
+
+
+# Types ENUM PostgreSQL natifs partagés (4 octets, comparaisons entières)
+SESSION_ENUM = Enum('N', 'R', name='session_enum') # Normale, Rattrapage
+STATUT_VALIDATION_ENUM = Enum('V', 'NV', 'AJ', name='statut_enum')
+
+
+class ValeurEchelonnee(TypeDecorator):
+    """
+    Décimal stocké en SmallInteger multiplié par `facteur` (ex: 10.25 -> 1025 pour facteur=100).
+    La conversion a lieu à la liaison des paramètres et à la lecture des résultats : noms d'attributs,
+    clés des dicts d'insertion en masse et agrégats SQL (SUM, AVG portent sur l'entier) sont inchangés.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, facteur: int):
+        super().__init__()
+        self.facteur = facteur
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int((Decimal(str(value)) * self.facteur).to_integral_value())
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return Decimal(str(value)) / self.facteur
+
+
 # ===================================================================
 # --- TABLES DE RÉFÉRENCE: HIERARCHIE ADMINISTRATIVE ET ACADÉMIQUE ---
 # ===================================================================
@@ -20,7 +63,8 @@ class Institution(Base):
     id_institution = Column(String(32), primary_key=True, unique=True, nullable=False) 
     nom = Column(String(255), nullable=False, unique=True)
     type_institution = Column(String(10), nullable=False)
-    description = Column(Text, nullable=True)
+    # Texte long affiché seulement en fiche détail : chargé à la demande (undefer() pour l'inclure)
+    description = deferred(Column(Text, nullable=True))
     
     # 🆕 NOUVEAU CHAMP : ABBRÉVIATION
     abbreviation = Column(String(20), nullable=True) # Ex: UF
@@ -37,7 +81,7 @@ class Composante(Base):
     
     code = Column(String(50), primary_key=True)
     label = Column(String(100))
-    description = Column(Text, nullable=True) 
+    description = deferred(Column(Text, nullable=True)) 
     
     # 🆕 NOUVEAU CHAMP : ABBRÉVIATION
     abbreviation = Column(String(20), nullable=True) # Ex: ENI, FS, FLSH
@@ -48,7 +92,7 @@ class Composante(Base):
     id_institution = Column(String(32), ForeignKey('institutions.id_institution'), nullable=False) 
     institution = relationship("Institution", back_populates="composantes")
     
-    mentions = relationship("Mention", backref="composante")
+    mentions = relationship("Mention", back_populates="composante")
 
     enseignants_permanents = relationship("Enseignant", back_populates="composante_attachement")
 
@@ -58,9 +102,9 @@ class Domaine(Base):
     
     code = Column(String(20), primary_key=True)
     label = Column(String(100))
-    description = Column(Text, nullable=True) 
+    description = deferred(Column(Text, nullable=True)) 
     
-    mentions = relationship("Mention", backref="domaine")
+    mentions = relationship("Mention", back_populates="domaine")
 
 class Mention(Base):
     __tablename__ = 'mentions'
@@ -72,7 +116,7 @@ class Mention(Base):
     id_mention = Column(String(50), primary_key=True) 
     code_mention = Column(String(30), nullable=False)
     label = Column(String(100))
-    description = Column(Text, nullable=True) 
+    description = deferred(Column(Text, nullable=True)) 
     
     # 🆕 NOUVEAU CHAMP : ABBRÉVIATION
     abbreviation = Column(String(20), nullable=True) # Ex: MI (Maths Info), SVE (Sciences de la Vie)
@@ -83,19 +127,26 @@ class Mention(Base):
     composante_code = Column(String(50), ForeignKey('composantes.code'), nullable=False)
     domaine_code = Column(String(20), ForeignKey('domaines.code'), nullable=False)
     
-    parcours = relationship("Parcours", backref="mention")
+    composante = relationship("Composante", back_populates="mentions")
+    domaine = relationship("Domaine", back_populates="mentions")
+    parcours = relationship("Parcours", back_populates="mention")
+    
+    # Raccourci d'affichage : libellé du domaine sans manipuler l'objet Domaine
+    domaine_label = association_proxy('domaine', 'label')
 
 class Parcours(Base):
     __tablename__ = 'parcours'
     __table_args__ = (
         UniqueConstraint('code_parcours', 'mention_id', name='unique_parcours_code_mention'),
+        # Parcours ouverts d'une mention (catalogue)
+        Index('ix_parcours_actif', 'mention_id', postgresql_where=text('date_fin IS NULL')),
         {'extend_existing': True}
     )
     
     id_parcours = Column(String(50), primary_key=True)
     code_parcours = Column(String(20), nullable=False)
     label = Column(String(100))
-    description = Column(Text, nullable=True) 
+    description = deferred(Column(Text, nullable=True)) 
     
     # 🆕 NOUVEAU CHAMP : ABBRÉVIATION
     abbreviation = Column(String(20), nullable=True) # Ex: MISS, BMC, EC
@@ -103,8 +154,8 @@ class Parcours(Base):
     # 🖼️ AJOUT DE CHAMP DE FICHIER
     logo_path = Column(String(255), nullable=True)
     
-    date_creation = Column(Integer, nullable=True)
-    date_fin = Column(Integer, nullable=True)
+    date_creation = Column(Date, nullable=True)
+    date_fin = Column(Date, nullable=True) # NULL : parcours toujours ouvert
 
     mention_id = Column(String(50), ForeignKey('mentions.id_mention'), nullable=False)
 
@@ -117,9 +168,18 @@ class Parcours(Base):
     )
 
     # 🚨 Nouvelle relation vers TypeFormation
-    type_formation_defaut = relationship("TypeFormation", back_populates="parcours")
+    # lazy="raise" : le libellé se lit dans le cache requetes.referentiels(), sans aller-retour en base
+    type_formation_defaut = relationship("TypeFormation", back_populates="parcours", lazy="raise")
     # 🆕 NOUVELLE RELATION : Pour lier le parcours aux niveaux (L1, M1, etc.)
     niveaux_couverts = relationship("ParcoursNiveau", back_populates="parcours_lie")
+    
+    # Navigation seule (le rattachement passe par mention_id) : ignorée par l'unité de travail
+    mention = relationship("Mention", back_populates="parcours", viewonly=True)
+    inscriptions = relationship("Inscription", back_populates="parcours")
+    
+    # Raccourcis d'affichage (domaine > mention > parcours)
+    mention_label = association_proxy('mention', 'label')
+    domaine_label = association_proxy('mention', 'domaine_label')
 
 # -------------------------------------------------------------------
 # --- TABLES DE RÉFÉRENCE: STRUCTURE LMD (CYCLE, NIVEAU, SEMESTRE) ---
@@ -134,7 +194,7 @@ class ParcoursNiveau(Base):
         {'extend_existing': True}
     )
     
-    id_parcours_niveau = Column(Integer, primary_key=True, autoincrement=True)
+    id_parcours_niveau = Column(BigInteger, Identity(always=False, cache=1000), primary_key=True)
     
     # Clés étrangères
     id_parcours = Column(String(50), ForeignKey('parcours.id_parcours'), nullable=False)
@@ -201,7 +261,7 @@ class UniteEnseignement(Base):
     intitule = Column(String(255), nullable=False)
     credit_ue = Column(Integer, nullable=False)
     
-    code_semestre = Column(String(10), ForeignKey('semestres.code_semestre'), nullable=False)
+    code_semestre = Column(String(10), ForeignKey('semestres.code_semestre'), nullable=False, index=True)
     semestre = relationship("Semestre", back_populates="unites_enseignement") 
     
     elements_constitutifs = relationship("ElementConstitutif", back_populates="unite_enseignement")
@@ -217,15 +277,19 @@ class ElementConstitutif(Base):
     intitule = Column(String(255), nullable=False)
     coefficient = Column(Integer, default=1, nullable=False)
     
-    id_ue = Column(String(50), ForeignKey('unites_enseignement.id_ue'), nullable=False)
+    id_ue = Column(String(50), ForeignKey('unites_enseignement.id_ue'), nullable=False, index=True)
     
     unite_enseignement = relationship("UniteEnseignement", back_populates="elements_constitutifs")
     
+    # Raccourcis d'affichage vers l'UE parente
+    code_ue = association_proxy('unite_enseignement', 'code_ue')
+    intitule_ue = association_proxy('unite_enseignement', 'intitule')
+    
     notes = relationship("Note", back_populates="element_constitutif")
 
     # 🚨 CORRECTION DANS ElementConstitutif: Utiliser back_populates
     volumes_horaires = relationship("VolumeHoraireEC", back_populates="element_constitutif")
-    affectations = relationship("AffectationEC", back_populates="element_constitutif") # Reste backref ici (vérifiez si cela cause un conflit avec AffectationEC)
+    affectations = relationship("AffectationEC", back_populates="element_constitutif")
 
 # ===================================================================
 # --- TABLES DE RÉFÉRENCE: UNITÉS D'ENSEIGNEMENT ET SESSIONS ---
@@ -235,7 +299,7 @@ class SessionExamen(Base):
     __tablename__ = 'sessions_examen'
     __table_args__ = {'extend_existing': True}
     
-    code_session = Column(String(5), primary_key=True) # Ex: N, R
+    code_session = Column(SESSION_ENUM, primary_key=True) # Ex: N, R
     label = Column(String(50), nullable=False, unique=True) # Ex: Normale, Rattrapage
     
     # Collection de toutes les Notes obtenues pour cette session
@@ -243,6 +307,9 @@ class SessionExamen(Base):
     
     # 🚨 CORRECTION FINALE : Collection de tous les ResultatUE obtenus pour cette session
     resultats_ue_session = relationship("ResultatUE", back_populates="session")
+    
+    # Collection de consultation uniquement (jamais modifiée depuis la session)
+    resultats_semestre = relationship("ResultatSemestre", back_populates="session", viewonly=True)
 
 
 # -------------------------------------------------------------------
@@ -255,7 +322,7 @@ class ModeInscription(Base): # 👈 CHANGEMENT DE NOM DE CLASSE
     
     code = Column(String(10), primary_key=True) # Ex: 'CLAS', 'HYB'
     label = Column(String(50), nullable=False, unique=True)
-    description = Column(Text, nullable=True) 
+    description = deferred(Column(Text, nullable=True)) 
     
     # Mise à jour de la relation
     inscriptions = relationship("Inscription", back_populates="mode_inscription") # 👈 CHANGEMENT DE NOM DE RELATION
@@ -270,7 +337,7 @@ class TypeFormation(Base):
     
     code = Column(String(10), primary_key=True) # Ex: FI, FC, FOAD
     label = Column(String(50), nullable=False, unique=True)
-    description = Column(Text, nullable=True)
+    description = deferred(Column(Text, nullable=True))
     
     parcours = relationship("Parcours", back_populates="type_formation_defaut")#
     
@@ -284,7 +351,7 @@ class AnneeUniversitaire(Base):
     __table_args__ = {'extend_existing': True} 
     
     annee = Column(String(9), primary_key=True)
-    description = Column(Text, nullable=True) 
+    description = deferred(Column(Text, nullable=True)) 
     ordre_annee = Column(Integer, unique=True, nullable=False) # 👈 AJOUT IMPORTANT
     
     # Correction des back_populates
@@ -339,6 +406,7 @@ class Etudiant(Base):
 class Inscription(Base):
     __tablename__ = 'inscriptions'
     __table_args__ = (
+        # Son index sert aussi les accès par étudiant et année (préfixe code_etudiant, annee_universitaire)
         UniqueConstraint(
             'code_etudiant', 
             'annee_universitaire', 
@@ -346,6 +414,10 @@ class Inscription(Base):
             'code_semestre', 
             name='uq_etudiant_annee_parcours_semestre' 
         ),
+        # Index partiel couvrant : semestres non validés, servis par un parcours d'index seul
+        Index('ix_insc_semestre_non_valide', 'code_etudiant', 'annee_universitaire',
+              postgresql_where=text('is_semestre_valide = false'),
+              postgresql_include=['code_semestre', 'credit_acquis_semestre']),
         {'extend_existing': True} 
     )
     
@@ -354,23 +426,25 @@ class Inscription(Base):
     # Clés étrangères
     code_etudiant = Column(String(50), ForeignKey('etudiants.code_etudiant'), nullable=False)
     annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), nullable=False)
-    id_parcours = Column(String(50), ForeignKey('parcours.id_parcours'), nullable=False)
-    code_semestre = Column(String(10), ForeignKey('semestres.code_semestre'), nullable=False)
+    id_parcours = Column(String(50), ForeignKey('parcours.id_parcours'), nullable=False, index=True)
+    code_semestre = Column(String(10), ForeignKey('semestres.code_semestre'), nullable=False, index=True)
     # Mise à jour de la clé étrangère
     code_mode_inscription = Column(String(10), ForeignKey('modes_inscription.code'), nullable=False) # 👈 CHANGEMENT DE TABLE RÉFÉRENCÉE et NOM DE COLONNE
     # 🚨 NOUVELLE CLÉ ÉTRANGÈRE : code_type_formation
     
     # CREDIT et VALIDATION du SEMESTRE
-    credit_acquis_semestre = Column(Integer, default=0) 
-    is_semestre_valide = Column(Boolean, default=False) 
+    # server_default : valeurs aussi appliquées par PostgreSQL aux chargements COPY / INSERT ... SELECT
+    credit_acquis_semestre = Column(Integer, default=0, server_default=text('0')) 
+    is_semestre_valide = Column(Boolean, default=False, server_default=text('false')) 
     
     # Relations
     etudiant = relationship("Etudiant", back_populates="inscriptions")
     annee_univ = relationship("AnneeUniversitaire", back_populates="inscriptions") 
-    parcours = relationship("Parcours", backref="inscriptions")
+    parcours = relationship("Parcours", back_populates="inscriptions")
     semestre = relationship("Semestre", back_populates="inscriptions")
     # Mise à jour de la relation
-    mode_inscription = relationship("ModeInscription", back_populates="inscriptions") 
+    # Libellé via requetes.referentiels() (voir Parcours.type_formation_defaut)
+    mode_inscription = relationship("ModeInscription", back_populates="inscriptions", lazy="raise") 
 
 
 class ResultatSemestre(Base):
@@ -382,31 +456,33 @@ class ResultatSemestre(Base):
     __table_args__ = (
         # 🚨 MISE À JOUR DE LA CONTRAINTE D'UNICITÉ : Ajout de 'code_session' 🚨
         UniqueConstraint('code_etudiant', 'code_semestre', 'annee_universitaire', 'code_session', name='uq_resultat_semestre_session'),
+        Index('ix_resultat_semestre_etudiant_annee_session', 'code_etudiant', 'annee_universitaire', 'code_session'),
     )
     
-    id_resultat = Column(Integer, primary_key=True, autoincrement=True)
+    id_resultat = Column(BigInteger, Identity(always=False, cache=1000), primary_key=True)
     
     # Clés Étrangères
     code_etudiant = Column(String(50), ForeignKey('etudiants.code_etudiant'), nullable=False)
-    code_semestre = Column(String(50), ForeignKey('semestres.code_semestre'), nullable=False)
-    annee_universitaire = Column(String(10), ForeignKey('annees_universitaires.annee'), nullable=False)
+    # Largeurs alignées sur les colonnes référencées (semestres.code_semestre, annees_universitaires.annee)
+    code_semestre = Column(String(10), ForeignKey('semestres.code_semestre'), nullable=False, index=True)
+    annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), nullable=False)
     
     # 🚨 AJOUT DE LA CLÉ ÉTRANGÈRE VERS LA SESSION D'EXAMEN 🚨
-    code_session = Column(String(5), ForeignKey('sessions_examen.code_session'), nullable=False)
+    code_session = Column(SESSION_ENUM, ForeignKey('sessions_examen.code_session'), nullable=False)
     
     # Indicateur de validation (V, NV, AJ)
-    statut_validation = Column(String(5), 
-                               CheckConstraint("statut_validation IN ('V', 'NV', 'AJ')", name='check_statut_validation'), 
-                               nullable=False)
+    statut_validation = Column(STATUT_VALIDATION_ENUM, nullable=False)
     
     # Informations de performance
-    credits_acquis = Column(Numeric(4, 1)) # Ex: 25.5 crédits sur 30
-    moyenne_obtenue = Column(Numeric(4, 2)) # Ex: 9.85/20
+    # Stockage entier échelonné (voir ValeurEchelonnee)
+    credits_acquis = Column(ValeurEchelonnee(10)) # ×10. Ex: 25.5 crédits sur 30 -> 255
+    moyenne_obtenue = Column(ValeurEchelonnee(100)) # ×100. Ex: 9.85/20 -> 985
     
     # Relations
     etudiant_resultat = relationship("Etudiant", back_populates="resultats_semestre")
     semestre = relationship("Semestre")
-    session = relationship("SessionExamen", backref="resultats_semestre") 
+    # Lecture seule : la session est fixée par code_session ; tout chargement paresseux lève une erreur
+    session = relationship("SessionExamen", back_populates="resultats_semestre", viewonly=True, lazy="raise") 
     annee_univ = relationship("AnneeUniversitaire") # Utilise le backref dans AnneeUniversitaire si défini
 
     def __repr__(self):
@@ -422,18 +498,26 @@ class ResultatUE(Base):
     __table_args__ = (
         # Un seul résultat final par UE, étudiant, année et session
         UniqueConstraint('code_etudiant', 'id_ue', 'annee_universitaire', 'code_session', name='uq_resultat_ue_unique'),
+        Index('ix_resultat_ue_etudiant_annee_session', 'code_etudiant', 'annee_universitaire', 'code_session'),
+        # Index partiel couvrant : UE non acquises, servies par un parcours d'index seul
+        Index('ix_ue_non_acquise', 'code_etudiant', 'annee_universitaire',
+              postgresql_where=text('is_ue_acquise = false'),
+              postgresql_include=['moyenne_ue', 'credit_obtenu']),
+        # Partitionnée par année (voir TABLES_PARTITIONNEES_PAR_ANNEE)
+        {'postgresql_partition_by': 'LIST (annee_universitaire)'}
     )
     
-    id_resultat_ue = Column(Integer, primary_key=True, autoincrement=True)
+    # La clé de partition fait partie de la clé primaire (contrainte PostgreSQL)
+    id_resultat_ue = colonne_id_sequence('resultats_ue_id_resultat_ue_seq')
+    annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), primary_key=True)
     
     # Clés Étrangères
     code_etudiant = Column(String(50), ForeignKey('etudiants.code_etudiant'), nullable=False)
-    id_ue = Column(String(50), ForeignKey('unites_enseignement.id_ue'), nullable=False)
-    annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), nullable=False)
-    code_session = Column(String(5), ForeignKey('sessions_examen.code_session'), nullable=False) 
+    id_ue = Column(String(50), ForeignKey('unites_enseignement.id_ue'), nullable=False, index=True)
+    code_session = Column(SESSION_ENUM, ForeignKey('sessions_examen.code_session'), nullable=False) 
     
     # RÉSULTAT CALCULÉ
-    moyenne_ue = Column(Numeric(4, 2), nullable=False) # Moyenne calculée des EC capitalisés (ex: 10.00)
+    moyenne_ue = Column(ValeurEchelonnee(100), nullable=False) # ×100. Moyenne calculée des EC capitalisés (ex: 10.00 -> 1000)
     is_ue_acquise = Column(Boolean, default=False, nullable=False) # TRUE si moyenne_ue >= 10
     credit_obtenu = Column(Integer, default=0, nullable=False) # Crédit total de l'UE (0 ou credit_ue)
 
@@ -460,19 +544,26 @@ class Note(Base):
             'code_session',
             name='uq_etudiant_ec_annee_session' 
         ),
-        {'extend_existing': True}
+        # Calcul des moyennes : index couvrant (EC et note inclus) -> parcours d'index seul, sans accès au tas
+        Index('ix_notes_covering', 'code_etudiant', 'annee_universitaire', 'code_session',
+              postgresql_include=['id_ec', 'valeur_note']),
+        # Toutes les notes d'un EC
+        Index('ix_note_ec', 'id_ec'),
+        # Partitionnée par année (voir TABLES_PARTITIONNEES_PAR_ANNEE)
+        {'extend_existing': True, 'postgresql_partition_by': 'LIST (annee_universitaire)'}
     )
     
-    id_note = Column(Integer, primary_key=True, autoincrement=True)
+    # La clé de partition fait partie de la clé primaire (contrainte PostgreSQL)
+    id_note = colonne_id_sequence('notes_id_note_seq')
+    annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), primary_key=True)
     
     # Clés Étrangères Composites
     code_etudiant = Column(String(50), ForeignKey('etudiants.code_etudiant'), nullable=False)
     id_ec = Column(String(50), ForeignKey('elements_constitutifs.id_ec'), nullable=False)
-    annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), nullable=False)
-    code_session = Column(String(5), ForeignKey('sessions_examen.code_session'), nullable=False)
+    code_session = Column(SESSION_ENUM, ForeignKey('sessions_examen.code_session'), nullable=False)
     
     # Donnée Principale
-    valeur_note = Column(Numeric(5, 2), nullable=False) # Note obtenue (permet les décimales)
+    valeur_note = Column(ValeurEchelonnee(100), nullable=False) # ×100. Note obtenue sur 20 (ex: 12.75 -> 1275)
 
     # Relations
     # 🚨 MISE À JOUR : Changement de backref pour correspondre au nom dans Etudiant
@@ -488,6 +579,114 @@ class Note(Base):
                 f"({self.annee_universitaire}, {self.code_session}): {self.valeur_note}>")
 
 
+# ===================================================================
+# --- TABLE DÉNORMALISÉE: RELEVÉ DE NOTES (LECTURE) ---
+# ===================================================================
+
+class VueResultat(Base):
+    """
+    Une ligne par note, aplatie avec son EC, son UE, le résultat d'UE et le résultat de semestre.
+    Table dérivée de Note (qui reste la source de vérité) : les relevés la lisent sans jointure.
+    Reconstruite en bloc par database_setup.rafraichir_vue_resultats() après chaque import.
+    """
+    __tablename__ = 'vue_resultats_etudiant'
+    __table_args__ = (
+        Index('ix_vue_resultat_etudiant_annee', 'code_etudiant', 'annee_universitaire'),
+        {'extend_existing': True}
+    )
+    
+    code_etudiant = Column(String(50), primary_key=True)
+    annee_universitaire = Column(String(9), primary_key=True)
+    code_session = Column(SESSION_ENUM, primary_key=True)
+    id_ec = Column(String(50), primary_key=True)
+    
+    code_ec = Column(String(20), nullable=False)
+    id_ue = Column(String(50), nullable=False)
+    code_ue = Column(String(20), nullable=False)
+    code_semestre = Column(String(10), nullable=False)
+    
+    # Mêmes échelles que les tables sources (copiées telles quelles par SQL_VUE_RESULTATS)
+    valeur_note = Column(ValeurEchelonnee(100), nullable=False)
+    moyenne_ue = Column(ValeurEchelonnee(100))
+    moyenne_semestre = Column(ValeurEchelonnee(100))
+    statut_validation = Column(STATUT_VALIDATION_ENUM)
+
+    def __repr__(self):
+        return (f"<VueResultat {self.code_etudiant} - {self.code_ec} "
+                f"({self.annee_universitaire}, {self.code_session}): {self.valeur_note}>")
+
+
+# Reconstruction complète des lignes dénormalisées (voir database_setup.rafraichir_vue_resultats)
+SQL_VUE_RESULTATS = """
+    INSERT INTO vue_resultats_etudiant (
+        code_etudiant, annee_universitaire, code_session, id_ec, code_ec, id_ue, code_ue,
+        code_semestre, valeur_note, moyenne_ue, moyenne_semestre, statut_validation
+    )
+    SELECT n.code_etudiant, n.annee_universitaire, n.code_session, ec.id_ec, ec.code_ec, ue.id_ue, ue.code_ue,
+           ue.code_semestre, n.valeur_note, ru.moyenne_ue, rs.moyenne_obtenue, rs.statut_validation
+    FROM notes n
+    JOIN elements_constitutifs ec ON ec.id_ec = n.id_ec
+    JOIN unites_enseignement ue ON ue.id_ue = ec.id_ue
+    LEFT JOIN resultats_ue ru
+        ON ru.code_etudiant = n.code_etudiant AND ru.id_ue = ue.id_ue
+       AND ru.annee_universitaire = n.annee_universitaire AND ru.code_session = n.code_session
+    LEFT JOIN resultats_semestre rs
+        ON rs.code_etudiant = n.code_etudiant AND rs.code_semestre = ue.code_semestre
+       AND rs.annee_universitaire = n.annee_universitaire AND rs.code_session = n.code_session
+"""
+
+
+# ===================================================================
+# --- VUES MATÉRIALISÉES (LECTURE SEULE) ---
+# ===================================================================
+# Les tables marquées info={'is_view': True} ne sont pas créées par create_all :
+# database_setup.init_db crée la vue à partir de SQL_VUES_MATERIALISEES.
+
+class MvResultatUE(Base):
+    """
+    Résultats d'UE aplatis avec l'identité de l'étudiant et l'intitulé de l'UE.
+    Vue matérialisée rafraîchie (CONCURRENTLY) après chaque import : lecture seule.
+    """
+    __tablename__ = 'mv_resultat_ue'
+    __table_args__ = {'info': {'is_view': True}}
+    
+    code_etudiant = Column(String(50), primary_key=True)
+    id_ue = Column(String(50), primary_key=True)
+    annee_universitaire = Column(String(9), primary_key=True)
+    code_session = Column(SESSION_ENUM, primary_key=True)
+    
+    moyenne_ue = Column(ValeurEchelonnee(100))
+    is_ue_acquise = Column(Boolean)
+    credit_obtenu = Column(Integer)
+    
+    nom = Column(String(100))
+    prenoms = Column(String(150))
+    code_ue = Column(String(20))
+    intitule = Column(String(255))
+
+    def __repr__(self):
+        return (f"<MvResultatUE {self.code_etudiant} - {self.code_ue} "
+                f"(Sess: {self.code_session}, Moy: {self.moyenne_ue}): {self.is_ue_acquise}>")
+
+
+# Définition SQL des vues matérialisées, avec l'index unique requis par REFRESH ... CONCURRENTLY
+SQL_VUES_MATERIALISEES = {
+    'mv_resultat_ue': (
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_resultat_ue AS
+        SELECT r.code_etudiant, r.id_ue, r.annee_universitaire, r.code_session,
+               r.moyenne_ue, r.is_ue_acquise, r.credit_obtenu,
+               e.nom, e.prenoms, ue.code_ue, ue.intitule
+        FROM resultats_ue r
+        JOIN etudiants e ON e.code_etudiant = r.code_etudiant
+        JOIN unites_enseignement ue ON ue.id_ue = r.id_ue
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_resultat_ue "
+        "ON mv_resultat_ue (code_etudiant, id_ue, annee_universitaire, code_session)",
+    ),
+}
+
+
 class SuiviCreditCycle(Base):
     __tablename__ = 'suivi_credits_cycles'
     __table_args__ = (
@@ -495,7 +694,7 @@ class SuiviCreditCycle(Base):
         {'extend_existing': True}
     )
     
-    id_suivi = Column(Integer, primary_key=True, autoincrement=True)
+    id_suivi = Column(BigInteger, Identity(always=False, cache=1000), primary_key=True)
     
     code_etudiant = Column(String(50), ForeignKey('etudiants.code_etudiant'), nullable=False)
     cycle_code = Column(String(10), ForeignKey('cycles.code'), nullable=False)
@@ -515,6 +714,8 @@ class Enseignant(Base):
     __tablename__ = 'enseignants'
     __table_args__ = (
         UniqueConstraint('cin', name='uq_enseignant_cin', deferrable=True),
+        # Enseignants permanents / vacataires d'une composante
+        Index('ix_ens_statut_comp', 'statut', 'code_composante_affectation'),
         {'extend_existing': True}
     )
     
@@ -528,9 +729,7 @@ class Enseignant(Base):
     
     # Renseignement administratifs/carrière
     grade = Column(String(50))
-    statut = Column(String(10), 
-                    CheckConstraint("statut IN ('PERM', 'VAC')", name='check_statut_enseignant'), 
-                    nullable=False)
+    statut = Column(Enum('PERM', 'VAC', name='statut_enseignant_enum'), nullable=False)
     code_composante_affectation = Column(String(50), 
                                          ForeignKey('composantes.code'), 
                                          nullable=True)
@@ -557,7 +756,7 @@ class TypeEnseignement(Base):
     __tablename__ = 'types_enseignement'
     __table_args__ = {'extend_existing': True}
     
-    code = Column(String(10), primary_key=True) # Ex: C, TD, TP
+    code = Column(String(3), primary_key=True) # Ex: C, TD, TP
     label = Column(String(50), unique=True, nullable=False)
     
     volumes_horaires = relationship("VolumeHoraireEC", back_populates="type_enseignement")
@@ -576,10 +775,10 @@ class VolumeHoraireEC(Base):
         {'extend_existing': True}
     )
     
-    id_volume_horaire = Column(Integer, primary_key=True, autoincrement=True)
+    id_volume_horaire = Column(BigInteger, Identity(always=False, cache=1000), primary_key=True)
     
     id_ec = Column(String(50), ForeignKey('elements_constitutifs.id_ec'), nullable=False)
-    code_type_enseignement = Column(String(10), ForeignKey('types_enseignement.code'), nullable=False)
+    code_type_enseignement = Column(String(3), ForeignKey('types_enseignement.code'), nullable=False)
     # 🚨 AJOUT POUR L'HISTORIQUE 🚨
     annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), nullable=False)
     
@@ -602,15 +801,19 @@ class AffectationEC(Base):
         # Un EC, pour un type d'enseignement et une année donnée, 
         # ne doit être assuré que par un seul enseignant (pour simplifier la gestion de la responsabilité)
         UniqueConstraint('id_ec', 'code_type_enseignement', 'annee_universitaire', name='uq_affectation_unique'), 
-        {'extend_existing': True}
+        # Charge d'un enseignant sur une année
+        Index('ix_affectation_enseignant_annee', 'id_enseignant', 'annee_universitaire'),
+        # Partitionnée par année (voir TABLES_PARTITIONNEES_PAR_ANNEE)
+        {'extend_existing': True, 'postgresql_partition_by': 'LIST (annee_universitaire)'}
     )
     
-    id_affectation = Column(Integer, primary_key=True, autoincrement=True)
+    # La clé de partition fait partie de la clé primaire (contrainte PostgreSQL)
+    id_affectation = colonne_id_sequence('affectations_ec_id_affectation_seq')
     
     id_enseignant = Column(String(50), ForeignKey('enseignants.id_enseignant'), nullable=False)
     id_ec = Column(String(50), ForeignKey('elements_constitutifs.id_ec'), nullable=False)
-    code_type_enseignement = Column(String(10), ForeignKey('types_enseignement.code'), nullable=False)
-    annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), nullable=False)
+    code_type_enseignement = Column(String(3), ForeignKey('types_enseignement.code'), nullable=False)
+    annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), primary_key=True)
     
     # Le volume horaire peut être repris du VolumeHoraireEC ou spécifié ici si ajustement (optionnel)
     volume_heure_effectif = Column(Numeric(5, 2), nullable=True) 
@@ -638,7 +841,7 @@ class Jury(Base):
         {'extend_existing': True}
     )
     
-    id_jury = Column(Integer, primary_key=True, autoincrement=True)
+    id_jury = Column(BigInteger, Identity(always=False, cache=1000), primary_key=True)
     
     # Clés Étrangères Composites
     id_enseignant = Column(String(50), ForeignKey('enseignants.id_enseignant'), nullable=False)
@@ -660,4 +863,24 @@ class Jury(Base):
     
     def __repr__(self):
         return (f"<Jury Sémestre {self.code_semestre} ({self.annee_universitaire}) "
-                f"présidé par {self.id_enseignant}>")
\ No newline at end of file
+                f"présidé par {self.id_enseignant}>")
+
+
+# ===================================================================
+# --- PARTITIONNEMENT PAR ANNÉE UNIVERSITAIRE ---
+# ===================================================================
+# Tables de faits partitionnées par LIST (annee_universitaire) : une partition par année
+# (créée par database_setup.creer_partitions_annuelles) et une partition DEFAULT qui reçoit
+# les lignes d'une année pas encore partitionnée.
+TABLES_PARTITIONNEES_PAR_ANNEE = [Note.__table__, ResultatUE.__table__, AffectationEC.__table__]
+
+# Place laissée libre dans chaque page des partitions pour les mises à jour HOT (recalcul des notes
+# et moyennes) ; PostgreSQL refuse les paramètres de stockage sur la table partitionnée elle-même.
+FILLFACTOR_PARTITIONS = 90
+
+for _table in TABLES_PARTITIONNEES_PAR_ANNEE:
+    event.listen(
+        _table, 'after_create',
+        DDL(f"CREATE TABLE IF NOT EXISTS {_table.name}_defaut PARTITION OF {_table.name} DEFAULT "
+            f"WITH (fillfactor = {FILLFACTOR_PARTITIONS})")
+    )
@@ -0,0 +1,189 @@
+# requetes.py
+
+import sys
+from functools import lru_cache
+
+from sqlalchemy import bindparam, lambda_stmt, select, text
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+
+import database_setup
+from models import (
+    Etudiant, Inscription, Note, ResultatUE, ResultatSemestre, VueResultat,
+    Cycle, Niveau, Semestre, ModeInscription, SessionExamen, TypeFormation,
+    TypeEnseignement, Domaine, Composante
+)
+
+# ===================================================================
+# --- REQUÊTES DE LECTURE (DOSSIERS, RELEVÉS) ---
+# ===================================================================
+# Les relations restent paresseuses dans les modèles : chaque requête déclare ici les relations
+# qu'elle charge (selectinload/joinedload) ; raiseload('*') fait échouer tout autre accès paresseux
+# au lieu d'émettre une requête par ligne (N+1).
+
+
+def charger_dossier_etudiant(session: Session, code_etudiant: str):
+    """
+    Charge un étudiant avec ses inscriptions (et leur semestre), ses notes (et leur EC)
+    et ses résultats d'UE (et leur UE), en une requête par collection.
+    Retourne None si l'étudiant n'existe pas.
+    """
+    stmt = (
+        select(Etudiant)
+        .where(Etudiant.code_etudiant == code_etudiant)
+        .options(
+            selectinload(Etudiant.inscriptions).joinedload(Inscription.semestre, innerjoin=True),
+            selectinload(Etudiant.notes_obtenues).joinedload(Note.element_constitutif, innerjoin=True),
+            selectinload(Etudiant.resultats_ue).joinedload(ResultatUE.unite_enseignement, innerjoin=True),
+            raiseload('*'),
+        )
+    )
+    return session.scalars(stmt).one_or_none()
+
+
+# --- Référentiels (cache mémoire du processus) ---
+# Tables de référence : (colonne code, colonne libellé) chargées une fois par processus
+COLONNES_REFERENTIELS = {
+    'cycles': (Cycle.code, Cycle.label),
+    'niveaux': (Niveau.code, Niveau.label),
+    'semestres': (Semestre.code_semestre, Semestre.numero_semestre),
+    'modes_inscription': (ModeInscription.code, ModeInscription.label),
+    'sessions_examen': (SessionExamen.code_session, SessionExamen.label),
+    'types_formation': (TypeFormation.code, TypeFormation.label),
+    'types_enseignement': (TypeEnseignement.code, TypeEnseignement.label),
+    'domaines': (Domaine.code, Domaine.label),
+    'composantes': (Composante.code, Composante.label),
+}
+
+
+@lru_cache(maxsize=None)
+def referentiels() -> dict:
+    """
+    Retourne {nom du référentiel: {code: libellé}} pour les tables de COLONNES_REFERENTIELS,
+    lu une seule fois par processus. Codes et libellés sont internés (sys.intern) : une seule
+    chaîne partagée par valeur. Remplace la navigation ORM vers ces tables (relations en lazy="raise").
+    Après modification d'un référentiel : referentiels.cache_clear().
+    """
+    session = database_setup.get_session()
+    try:
+        return {
+            nom: {
+                sys.intern(code): sys.intern(label) if label is not None else None
+                for code, label in session.execute(select(col_code, col_label))
+            }
+            for nom, (col_code, col_label) in COLONNES_REFERENTIELS.items()
+        }
+    finally:
+        session.close()
+
+
+# --- Relevé d'un étudiant pour une année ---
+# Instructions construites une seule fois (lambda_stmt) et paramétrées par bindparam :
+# les appels suivants réutilisent le SQL compilé au lieu de reconstruire la requête.
+_RELEVE_NOTES = lambda_stmt(lambda: (
+    select(Note)
+    .where(Note.code_etudiant == bindparam('code_etudiant'),
+           Note.annee_universitaire == bindparam('annee_universitaire'))
+    .options(joinedload(Note.element_constitutif, innerjoin=True), raiseload('*'))
+))
+_RELEVE_RESULTATS_UE = lambda_stmt(lambda: (
+    select(ResultatUE)
+    .where(ResultatUE.code_etudiant == bindparam('code_etudiant'),
+           ResultatUE.annee_universitaire == bindparam('annee_universitaire'))
+    .options(joinedload(ResultatUE.unite_enseignement, innerjoin=True), raiseload('*'))
+))
+_RELEVE_RESULTATS_SEMESTRE = lambda_stmt(lambda: (
+    select(ResultatSemestre)
+    .where(ResultatSemestre.code_etudiant == bindparam('code_etudiant'),
+           ResultatSemestre.annee_universitaire == bindparam('annee_universitaire'))
+    .options(raiseload('*'))
+))
+
+_RELEVE_DENORMALISE = lambda_stmt(lambda: (
+    select(VueResultat)
+    .where(VueResultat.code_etudiant == bindparam('code_etudiant'),
+           VueResultat.annee_universitaire == bindparam('annee_universitaire'))
+    .order_by(VueResultat.code_semestre, VueResultat.code_ue, VueResultat.code_ec, VueResultat.code_session)
+))
+
+
+def charger_releve(session: Session, code_etudiant: str, annee_universitaire: str) -> dict:
+    """
+    Charge les notes (avec leur EC), les résultats d'UE (avec leur UE) et les résultats
+    de semestre d'un étudiant pour une année universitaire.
+    """
+    parametres = {'code_etudiant': code_etudiant, 'annee_universitaire': annee_universitaire}
+    return {
+        'notes': session.scalars(_RELEVE_NOTES, parametres).all(),
+        'resultats_ue': session.scalars(_RELEVE_RESULTATS_UE, parametres).all(),
+        'resultats_semestre': session.scalars(_RELEVE_RESULTATS_SEMESTRE, parametres).all(),
+    }
+
+
+def lire_releve(session: Session, code_etudiant: str, annee_universitaire: str) -> list:
+    """
+    Lit le relevé d'un étudiant pour une année dans la table dénormalisée vue_resultats_etudiant :
+    une ligne par note (EC, UE, semestre, moyennes et statut), sans jointure, triée par semestre/UE/EC.
+    """
+    parametres = {'code_etudiant': code_etudiant, 'annee_universitaire': annee_universitaire}
+    return session.scalars(_RELEVE_DENORMALISE, parametres).all()
+
+
+# --- Relevé complet en un seul aller-retour (JSONB imbriqué) ---
+# Chaque CTE agrège un niveau (notes -> EC -> UE -> inscription/semestre) ; la requête racine
+# renvoie l'étudiant et toute l'arborescence sous forme d'un unique document JSONB.
+# Les notes sont stockées ×facteur (ValeurEchelonnee de Note.valeur_note) : le diviseur SQL en est dérivé.
+# Limite : UE et notes ne portent pas le parcours ; deux inscriptions au même semestre la même année
+# (parcours différents) reçoivent donc les mêmes unités.
+_FACTEUR_NOTE = Note.valeur_note.type.facteur
+_SQL_RELEVE_JSON = text(f"""
+    WITH notes_ec AS (
+        SELECT n.annee_universitaire, n.id_ec,
+               jsonb_agg(jsonb_build_object('session', n.code_session, 'note', n.valeur_note / {_FACTEUR_NOTE:.1f})
+                         ORDER BY n.code_session) AS notes
+        FROM notes n
+        WHERE n.code_etudiant = :code_etudiant
+        GROUP BY n.annee_universitaire, n.id_ec
+    ),
+    ec_ue AS (
+        SELECT ne.annee_universitaire, ec.id_ue,
+               jsonb_agg(jsonb_build_object('code_ec', ec.code_ec, 'intitule', ec.intitule,
+                                            'coefficient', ec.coefficient, 'notes', ne.notes)
+                         ORDER BY ec.code_ec) AS elements
+        FROM notes_ec ne
+        JOIN elements_constitutifs ec ON ec.id_ec = ne.id_ec
+        GROUP BY ne.annee_universitaire, ec.id_ue
+    ),
+    ue_semestre AS (
+        SELECT eu.annee_universitaire, ue.code_semestre,
+               jsonb_agg(jsonb_build_object('code_ue', ue.code_ue, 'intitule', ue.intitule,
+                                            'credit', ue.credit_ue, 'elements', eu.elements)
+                         ORDER BY ue.code_ue) AS unites
+        FROM ec_ue eu
+        JOIN unites_enseignement ue ON ue.id_ue = eu.id_ue
+        GROUP BY eu.annee_universitaire, ue.code_semestre
+    ),
+    inscriptions_agg AS (
+        SELECT jsonb_agg(jsonb_build_object('annee_universitaire', i.annee_universitaire,
+                                            'id_parcours', i.id_parcours,
+                                            'code_semestre', i.code_semestre,
+                                            'unites', COALESCE(us.unites, '[]'::jsonb))
+                         ORDER BY i.annee_universitaire, i.code_semestre) AS inscriptions
+        FROM inscriptions i
+        LEFT JOIN ue_semestre us
+            ON us.annee_universitaire = i.annee_universitaire AND us.code_semestre = i.code_semestre
+        WHERE i.code_etudiant = :code_etudiant
+    )
+    SELECT jsonb_build_object('code_etudiant', e.code_etudiant, 'nom', e.nom, 'prenoms', e.prenoms,
+                              'inscriptions', COALESCE(ia.inscriptions, '[]'::jsonb))
+    FROM etudiants e
+    CROSS JOIN inscriptions_agg ia
+    WHERE e.code_etudiant = :code_etudiant
+""")
+
+
+def releve_json(session: Session, code_etudiant: str):
+    """
+    Retourne le relevé complet d'un étudiant (inscriptions > UE > EC > notes par session)
+    sous forme de dict, construit côté PostgreSQL en une seule requête. None si l'étudiant n'existe pas.
+    """
+    return session.execute(_SQL_RELEVE_JSON, {'code_etudiant': code_etudiant}).scalar_one_or_none()